@@ -0,0 +1,472 @@
+"""Local stand-in for the VeSync cloud API.
+
+Serves just enough of the endpoints used by pyvesync 2.1.10 for the device
+classes supported by this integration. Every device keeps a small mutable
+state so that commands sent by Home Assistant show up in the next poll.
+
+Run it standalone with::
+
+    python -m benchmarks.fake_vesync_cloud --outlets 40 --humidifiers-300s 4
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+from aiohttp import web
+
+DEVICE_MODELS = {
+    "outlets": ("ESW03-USA", "wifi-switch"),
+    "fans": ("Core300S", "wifi-air"),
+    "humidifiers_200s": ("Classic200S", "wifi-air"),
+    "humidifiers_300s": ("Classic300S", "wifi-air"),
+    "humidifiers_1000s": ("LUH-M101S-WUS", "wifi-air"),
+    "bulbs": ("ESL100", "Wifi-light"),
+    "dimmers": ("ESWD16", "Wifi-switch"),
+    "airfryers": ("CS158-AF", "wifi-kitchen"),
+}
+
+OK = {"code": 0, "msg": "request success"}
+
+
+@dataclass
+class FakeDevice:
+    """State of a simulated device."""
+
+    kind: str
+    index: int
+    state: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def cid(self) -> str:
+        """Return the cloud id of the device."""
+        return f"{self.kind}-cid-{self.index}"
+
+    @property
+    def uuid(self) -> str:
+        """Return the uuid of the device."""
+        return f"{self.kind}-uuid-{self.index}"
+
+    def as_list_entry(self) -> dict[str, Any]:
+        """Return the entry describing this device in the device list."""
+        device_type, conf_module = DEVICE_MODELS[self.kind]
+        return {
+            "deviceName": f"{device_type} {self.index}",
+            "deviceImg": "",
+            "cid": self.cid,
+            "uuid": self.uuid,
+            "macID": f"00:00:00:00:{self.index // 256:02x}:{self.index % 256:02x}",
+            "deviceType": device_type,
+            "type": conf_module,
+            "configModule": f"{conf_module}_{device_type}",
+            "connectionType": "wifi",
+            "connectionStatus": self.state["connection_status"],
+            # Like the cloud, fans and humidifiers are always listed as on.
+            "deviceStatus": "on"
+            if self.state["on"] or conf_module == "wifi-air"
+            else "off",
+            "currentFirmVersion": "1.0.0",
+            "subDeviceNo": None,
+            "deviceRegion": "US",
+            "extension": None,
+        }
+
+
+class FakeVeSyncCloud:
+    """In-process fake of the VeSync cloud HTTP API."""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int | None = None,
+        **counts: int,
+    ) -> None:
+        """Create ``counts[kind]`` devices of every kind in ``DEVICE_MODELS``."""
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests: Counter[str] = Counter()
+        self.token = "fake-token"
+        self._tokens_issued = 0
+        # Cleared to refuse the password, as when it is wrong.
+        self.login_allowed = True
+        # Devices whose requests are not answered until the cloud stops.
+        self.hanging: set[str] = set()
+        self._stopped = asyncio.Event()
+        self._random = random.Random(seed)
+        self.devices: list[FakeDevice] = []
+        for kind in DEVICE_MODELS:
+            for index in range(counts.get(kind, 0)):
+                self.devices.append(FakeDevice(kind, index, self._initial(kind)))
+        self._by_cid = {dev.cid: dev for dev in self.devices}
+        self._by_uuid = {dev.uuid: dev for dev in self.devices}
+        self._runner: web.AppRunner | None = None
+        self.url: str | None = None
+
+    def _initial(self, kind: str) -> dict[str, Any]:
+        """Return the initial state of a device."""
+        state: dict[str, Any] = {"connection_status": "online", "on": True}
+        if kind == "outlets":
+            state.update(power=self._random.uniform(0, 200), energy=0.5, voltage=120)
+        elif kind == "fans":
+            state.update(
+                mode="manual",
+                level=1,
+                air_quality=1,
+                air_quality_value=5,
+                filter_life=90,
+                display=True,
+                child_lock=False,
+                night_light="off",
+            )
+        elif kind.startswith("humidifiers"):
+            state.update(
+                humidity=45,
+                target_humidity=50,
+                mode="manual",
+                mist_level=1,
+                display=True,
+                automatic_stop=True,
+                night_light_brightness=0,
+            )
+        elif kind in ("bulbs", "dimmers"):
+            state.update(brightness=50)
+        elif kind == "airfryers":
+            state.update(cook_status="standby")
+        return state
+
+    def drift(self, fraction: float) -> None:
+        """Change the readings of a random ``fraction`` of the devices."""
+        for dev in self._random.sample(
+            self.devices, round(len(self.devices) * fraction)
+        ):
+            state = dev.state
+            if "power" in state:
+                state["power"] = self._random.uniform(0, 200)
+                state["energy"] += state["power"] / 1000 / 60
+            if "humidity" in state:
+                state["humidity"] = self._random.randint(30, 70)
+            if "air_quality_value" in state:
+                state["air_quality_value"] = self._random.randint(1, 50)
+            if "brightness" in state:
+                state["brightness"] = self._random.randint(1, 100)
+
+    def expire_token(self) -> None:
+        """Refuse the current token until the next login."""
+        self._tokens_issued += 1
+        self.token = f"fake-token-{self._tokens_issued}"
+
+    def reset_counters(self) -> None:
+        """Reset the per-endpoint request counters."""
+        self.requests.clear()
+
+    @property
+    def total_requests(self) -> int:
+        """Return the number of requests served since the last reset."""
+        return sum(self.requests.values())
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL."""
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        self._stopped.set()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        """Dispatch a request to the matching endpoint."""
+        path = request.path
+        try:
+            body = await request.json()
+        except ValueError:
+            body = {}
+        body = body or {}
+        key = path
+        if isinstance(body.get("payload"), dict):
+            key = f"{path}#{body['payload'].get('method')}"
+        elif isinstance(body.get("jsonCmd"), dict):
+            key = f"{path}#{next(iter(body['jsonCmd']), '')}"
+        self.requests[key] += 1
+        token = body.get("token") or request.headers.get("tk")
+        if path.lower() != "/cloud/v1/user/login" and token not in (None, self.token):
+            return web.json_response({"code": -11012022, "msg": "token expired"})
+
+        if (dev := self._device(body)) is not None and dev.cid in self.hanging:
+            await self._stopped.wait()
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+        if self.error_rate and self._random.random() < self.error_rate:
+            if self._random.random() < 0.5:
+                return web.Response(status=500)
+            return web.json_response({"code": -11000000, "msg": "injected error"})
+        return web.json_response(self._respond(path.lower(), body))
+
+    def _device(self, body: dict[str, Any]) -> FakeDevice | None:
+        """Return the device a request is about."""
+        if (dev := self._by_cid.get(body.get("cid"))) is not None:
+            return dev
+        return self._by_uuid.get(body.get("uuid"))
+
+    def _respond(self, path: str, body: dict[str, Any]) -> dict[str, Any]:
+        """Build the JSON response of an endpoint."""
+        if path == "/cloud/v1/user/login":
+            if not self.login_allowed:
+                return {"code": -11201000, "msg": "password incorrect"}
+            return {
+                **OK,
+                "result": {
+                    "token": self.token,
+                    "accountID": "1234567",
+                    "countryCode": "US",
+                },
+            }
+        if path == "/cloud/v1/devicemanaged/devices":
+            return {
+                **OK,
+                "result": {
+                    "total": len(self.devices),
+                    "list": [dev.as_list_entry() for dev in self.devices],
+                },
+            }
+        if path == "/cloud/v1/devicemanaged/configinfo":
+            return {**OK, "result": {"pid": "fake-pid"}}
+        if path == "/cloud/v2/devicemanaged/configurationsv2":
+            return {**OK, "result": {"airFryerInfo": {"workTempUnit": "c"}}}
+        if path == "/cloud/v1/devicemanaged/getremotecookmode158":
+            return {**OK, "result": {"readyStart": False}}
+
+        dev = self._device(body)
+        if dev is None:
+            return {"code": -11201000, "msg": "device not found"}
+        state = dev.state
+        if state["connection_status"] != "online":
+            return {"code": -11300030, "msg": "device offline"}
+
+        if path == "/cloud/v2/devicemanaged/bypassv2":
+            return self._bypass_v2(dev, body["payload"])
+        if path == "/cloud/v1/devicemanaged/bypass":
+            return self._fryer(dev, body.get("jsonCmd", {}))
+        if path.endswith("/devicestatus"):
+            state["on"] = body.get("status") == "on"
+            return OK
+        if path.endswith("/updatebrightness"):
+            state["brightness"] = int(body.get("brightNess", body.get("brightness")))
+            return OK
+        if path.endswith(("/energyweek", "/energymonth", "/energyyear")):
+            return self._energy(dev, path.rsplit("/", 1)[1])
+        if path.endswith("/devicedetail"):
+            return self._detail(dev)
+        return OK
+
+    @staticmethod
+    def _detail(dev: FakeDevice) -> dict[str, Any]:
+        """Build the response of a v1 ``devicedetail`` endpoint."""
+        state = dev.state
+        status = "on" if state["on"] else "off"
+        common = {**OK, "deviceStatus": status, "connectionStatus": "online"}
+        if dev.kind == "outlets":
+            return {
+                **common,
+                "activeTime": 10,
+                "energy": round(state["energy"], 3),
+                "power": f"{state['power'] if state['on'] else 0:.2f}",
+                "voltage": f"{state['voltage']:.2f}",
+                "nightLightStatus": "off",
+                "nightLightAutomode": "off",
+                "nightLightBrightness": 0,
+            }
+        if dev.kind == "bulbs":
+            return {**common, "brightNess": str(state["brightness"])}
+        return {
+            **common,
+            "activeTime": 10,
+            "brightness": state["brightness"],
+            "rgbStatus": "off",
+            "rgbValue": {"red": 0, "green": 0, "blue": 0},
+            "indicatorlightStatus": "off",
+        }
+
+    def _energy(self, dev: FakeDevice, period: str) -> dict[str, Any]:
+        """Build the response of an energy history endpoint."""
+        days = {"energyweek": 7, "energymonth": 30, "energyyear": 12}[period]
+        data = [round(self._random.uniform(0, 2), 3) for _ in range(days)]
+        return {
+            **OK,
+            "energyConsumptionOfToday": round(dev.state["energy"], 3),
+            "costPerKWH": 0.15,
+            "maxEnergy": max(data),
+            "totalEnergy": round(sum(data), 3),
+            "currency": "USD",
+            "data": data,
+        }
+
+    def _bypass_v2(self, dev: FakeDevice, payload: dict[str, Any]) -> dict[str, Any]:
+        """Handle a ``bypassV2`` request for fans and humidifiers."""
+        state = dev.state
+        method = payload.get("method")
+        data = payload.get("data") or {}
+        if method == "getPurifierStatus":
+            result = {
+                "enabled": state["on"],
+                "filter_life": state["filter_life"],
+                "mode": state["mode"],
+                "level": state["level"],
+                "air_quality": state["air_quality"],
+                "air_quality_value": state["air_quality_value"],
+                "display": state["display"],
+                "child_lock": state["child_lock"],
+                "night_light": state["night_light"],
+                "configuration": {"display": True, "display_forever": False},
+            }
+        elif method == "getHumidifierStatus" and dev.kind == "humidifiers_1000s":
+            result = {
+                "powerSwitch": int(state["on"]),
+                "humidity": state["humidity"],
+                "targetHumidity": state["target_humidity"],
+                "virtualLevel": state["mist_level"],
+                "mistLevel": state["mist_level"],
+                "workMode": state["mode"],
+                "waterLacksState": 0,
+                "waterTankLifted": 0,
+                "autoStopSwitch": int(state["automatic_stop"]),
+                "autoStopState": 0,
+                "screenSwitch": int(state["display"]),
+                "screenState": int(state["display"]),
+            }
+        elif method == "getHumidifierStatus":
+            result = {
+                "enabled": state["on"],
+                "humidity": state["humidity"],
+                "mist_virtual_level": state["mist_level"],
+                "mist_level": state["mist_level"],
+                "mode": state["mode"],
+                "water_lacks": False,
+                "humidity_high": False,
+                "water_tank_lifted": False,
+                "display": state["display"],
+                "automatic_stop_reach_target": False,
+                "night_light_brightness": state["night_light_brightness"],
+                "configuration": {
+                    "auto_target_humidity": state["target_humidity"],
+                    "display": state["display"],
+                    "automatic_stop": state["automatic_stop"],
+                },
+            }
+        else:
+            self._apply_bypass_command(state, method, data)
+            result = {}
+        return {**OK, "result": {"code": 0, "result": result}}
+
+    @staticmethod
+    def _apply_bypass_command(
+        state: dict[str, Any], method: str | None, data: dict[str, Any]
+    ) -> None:
+        """Apply a ``bypassV2`` command to the device state."""
+        if method == "setSwitch":
+            state["on"] = bool(data.get("enabled", data.get("powerSwitch")))
+        elif method in ("setLevel", "setVirtualLevel"):
+            level = data.get("level", data.get("virtualLevel"))
+            state["level" if "level" in state else "mist_level"] = level
+        elif method in ("setPurifierMode", "setHumidityMode"):
+            state["mode"] = data.get("mode", data.get("workMode"))
+        elif method == "setTargetHumidity":
+            state["target_humidity"] = data.get(
+                "target_humidity", data.get("targetHumidity")
+            )
+        elif method == "setDisplay":
+            state["display"] = bool(data.get("state", data.get("screenSwitch")))
+        elif method == "setChildLock":
+            state["child_lock"] = data.get("child_lock")
+        elif method in ("setAutomaticStop", "setAutoStopSwitch"):
+            state["automatic_stop"] = bool(
+                data.get("enabled", data.get("autoStopSwitch"))
+            )
+        elif method == "setNightLightBrightness":
+            state["night_light_brightness"] = data.get("night_light_brightness")
+        elif method == "setNightLight":
+            state["night_light"] = data.get("night_light")
+
+    @staticmethod
+    def _fryer(dev: FakeDevice, json_cmd: dict[str, Any]) -> dict[str, Any]:
+        """Handle an air fryer ``bypass`` request."""
+        state = dev.state
+        if "getStatus" in json_cmd:
+            if state["cook_status"] == "standby":
+                return {**OK, "result": {"returnStatus": {"cookStatus": "standby"}}}
+            return {
+                **OK,
+                "result": {
+                    "returnStatus": {
+                        "cookStatus": state["cook_status"],
+                        "curentTemp": 150,
+                        "cookSetTemp": 180,
+                        "cookSetTime": 600,
+                        "cookLastTime": 300,
+                        "tempUnit": "c",
+                    }
+                },
+            }
+        cook = json_cmd.get("cookMode") or json_cmd.get("preheat") or {}
+        if cook.get("cookStatus") == "end":
+            state["cook_status"] = "standby"
+        elif "cookStatus" in cook:
+            state["cook_status"] = cook["cookStatus"]
+        return OK
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    for kind in DEVICE_MODELS:
+        parser.add_argument(f"--{kind.replace('_', '-')}", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8080)
+    return parser.parse_args()
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    """Serve until interrupted."""
+    cloud = FakeVeSyncCloud(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        **{kind: getattr(args, kind) for kind in DEVICE_MODELS},
+    )
+    url = await cloud.start(port=args.port)
+    print(f"Fake VeSync cloud with {len(cloud.devices)} devices on {url}")
+    started = time.monotonic()
+    try:
+        while True:
+            await asyncio.sleep(60)
+            print(
+                f"{cloud.total_requests} requests in {time.monotonic() - started:.0f}s"
+            )
+    finally:
+        await cloud.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_serve(_parse_args()))
+    except KeyboardInterrupt:
+        pass
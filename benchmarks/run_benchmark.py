@@ -0,0 +1,186 @@
+"""Load benchmark of the VeSync integration against the fake cloud.
+
+Sets up a bare Home Assistant core, adds a VeSync config entry pointing at
+``FakeVeSyncCloud`` and reports setup time, per-cycle latency, requests per
+cycle, state writes per cycle, CPU time and memory per entity.
+
+    python -m benchmarks.run_benchmark --outlets 100 --fans 10 --latency 0.2
+
+By default a cycle only polls the devices the coordinator considers due, as
+it would in production. ``--poll-all`` marks every device due before each
+cycle to measure a full refresh.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from homeassistant import loader  # noqa: E402
+from homeassistant.config_entries import ConfigEntries, ConfigEntry  # noqa: E402
+from homeassistant.const import (  # noqa: E402
+    CONF_PASSWORD,
+    CONF_USERNAME,
+    EVENT_STATE_CHANGED,
+)
+from homeassistant.core import CoreState, HomeAssistant  # noqa: E402
+from homeassistant.helpers import (  # noqa: E402
+    area_registry,
+    device_registry,
+    entity,
+    entity_registry,
+    restore_state,
+)
+from pyvesync import helpers as pyvesync_helpers  # noqa: E402
+
+from benchmarks.fake_vesync_cloud import DEVICE_MODELS, FakeVeSyncCloud  # noqa: E402
+from custom_components.vesync.const import DOMAIN  # noqa: E402
+
+
+async def async_start_hass(config_dir: str) -> HomeAssistant:
+    """Start a minimal Home Assistant instance."""
+    hass = HomeAssistant()
+    hass.config.config_dir = config_dir
+    hass.config.skip_pip = True
+    hass.config.set_time_zone("UTC")
+    hass.data[loader.DATA_CUSTOM_COMPONENTS] = None
+    if hasattr(entity, "async_setup"):
+        entity.async_setup(hass)
+    loads = [
+        area_registry.async_load(hass),
+        device_registry.async_load(hass),
+        entity_registry.async_load(hass),
+    ]
+    # Before 2023.4 restored states are loaded on first use.
+    if hasattr(restore_state, "async_load"):
+        loads.append(restore_state.async_load(hass))
+    await asyncio.gather(*loads)
+    hass.config_entries = ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    hass.state = CoreState.running
+    return hass
+
+
+def point_at(url: str) -> None:
+    """Send every VeSync request to ``url``."""
+    pyvesync_helpers.API_BASE_URL = url
+
+
+async def async_run(args: argparse.Namespace) -> dict:
+    """Run the benchmark and return the results."""
+    cloud = FakeVeSyncCloud(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=0,
+        **{kind: getattr(args, kind) for kind in DEVICE_MODELS},
+    )
+    point_at(await cloud.start())
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await async_start_hass(config_dir)
+        entry = ConfigEntry(
+            version=1,
+            domain=DOMAIN,
+            title="benchmark",
+            data={CONF_USERNAME: "bench@example.com", CONF_PASSWORD: "secret"},
+            source="user",
+            options=args.options,
+        )
+
+        tracemalloc.start()
+        cpu = time.process_time()
+        started = time.perf_counter()
+        await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+        setup_time = time.perf_counter() - started
+        setup_cpu = time.process_time() - cpu
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        setup_requests = dict(cloud.requests)
+
+        entities = [
+            state
+            for state in hass.states.async_all()
+            if state.entity_id.split(".")[0] != "zone"
+        ]
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        state_changes = []
+        hass.bus.async_listen(EVENT_STATE_CHANGED, state_changes.append)
+
+        latencies, cycle_requests, cycle_cpu, cycle_writes = [], [], [], []
+        for _ in range(args.cycles):
+            cloud.drift(args.change_rate)
+            if args.poll_all:
+                coordinator.scheduler._next_poll.clear()
+            cloud.reset_counters()
+            state_changes.clear()
+            cpu = time.process_time()
+            started = time.perf_counter()
+            await coordinator.async_refresh()
+            await hass.async_block_till_done()
+            latencies.append(time.perf_counter() - started)
+            cycle_cpu.append(time.process_time() - cpu)
+            cycle_requests.append(cloud.total_requests)
+            cycle_writes.append(len(state_changes))
+
+        await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_stop(force=True)
+    await cloud.stop()
+
+    return {
+        "devices": len(cloud.devices),
+        "entities": len(entities),
+        "setup_seconds": round(setup_time, 3),
+        "setup_cpu_seconds": round(setup_cpu, 3),
+        "setup_requests": sum(setup_requests.values()),
+        "cycle_seconds_median": round(statistics.median(latencies), 3),
+        "cycle_seconds_max": round(max(latencies), 3),
+        "cycle_cpu_seconds_median": round(statistics.median(cycle_cpu), 4),
+        "requests_per_cycle": round(statistics.mean(cycle_requests), 1),
+        "state_changes_per_cycle": round(statistics.mean(cycle_writes), 1),
+        "memory_per_entity_kib": round(memory / max(len(entities), 1) / 1024, 1),
+        "last_cycle_requests": dict(cloud.requests),
+    }
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    for kind in DEVICE_MODELS:
+        parser.add_argument(f"--{kind.replace('_', '-')}", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument(
+        "--change-rate",
+        type=float,
+        default=0.1,
+        help="fraction of devices whose readings change between cycles",
+    )
+    parser.add_argument("--poll-all", action="store_true")
+    parser.add_argument(
+        "--options", type=json.loads, default={}, help="config entry options (JSON)"
+    )
+    parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = _parse_args()
+    logging.basicConfig(
+        level=logging.DEBUG if arguments.verbose else logging.WARNING,
+        format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    )
+    print(json.dumps(asyncio.run(async_run(arguments)), indent=2))
@@ -0,0 +1,194 @@
+"""Startup benchmark of the VeSync integration.
+
+Measures in fresh interpreters how long importing the integration and its
+platform modules takes once Home Assistant is loaded, and whether that pulls
+in pyvesync. Then times the setup of a config entry against
+``FakeVeSyncCloud``, reports the platforms it loaded and the requests sent
+while registering entities, and times a second setup from the stored
+device inventory.
+
+    python -m benchmarks.startup_benchmark --outlets 20 --humidifiers-300s 2
+
+``--update-before-add`` registers entities the way the integration used to,
+updating each one before adding it, to show the requests this costs.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.helpers.entity_platform import EntityPlatform, async_get_platforms
+
+from benchmarks.fake_vesync_cloud import DEVICE_MODELS, FakeVeSyncCloud
+from benchmarks.run_benchmark import ROOT, async_start_hass, point_at
+from custom_components.vesync import PLATFORMS, inventory
+from custom_components.vesync.const import DOMAIN
+
+# Home Assistant modules are imported first so that only the cost of the
+# integration itself is measured.
+IMPORT_SCRIPT = """
+import importlib, json, sys, time
+sys.path.insert(0, {root!r})
+import homeassistant.helpers.update_coordinator
+import homeassistant.components.diagnostics
+for platform in {platforms!r}:
+    importlib.import_module("homeassistant.components." + platform)
+started = time.perf_counter()
+for module in {modules!r}:
+    importlib.import_module(module)
+print(json.dumps({{
+    "seconds": time.perf_counter() - started,
+    "pyvesync_imported": "pyvesync" in sys.modules,
+}}))
+"""
+
+
+def measure_import(modules: list[str], runs: int) -> dict:
+    """Import ``modules`` in ``runs`` fresh interpreters."""
+    script = IMPORT_SCRIPT.format(
+        root=str(ROOT),
+        platforms=[str(platform) for platform in PLATFORMS],
+        modules=modules,
+    )
+    results = [
+        json.loads(
+            subprocess.run(
+                [sys.executable, "-c", script],
+                capture_output=True,
+                check=True,
+                text=True,
+            ).stdout
+        )
+        for _ in range(runs)
+    ]
+    return {
+        "seconds_median": round(
+            statistics.median(result["seconds"] for result in results), 4
+        ),
+        "pyvesync_imported": results[0]["pyvesync_imported"],
+    }
+
+
+def _update_before_add() -> None:
+    """Update every entity before adding it, like the integration used to."""
+    async_add_entities = EntityPlatform.async_add_entities
+
+    async def _async_add_entities(self, new_entities, update_before_add=False):
+        await async_add_entities(self, new_entities, update_before_add=True)
+
+    EntityPlatform.async_add_entities = _async_add_entities
+
+
+def _count_registration_requests(hass, cloud: FakeVeSyncCloud, counts: list) -> None:
+    """Count the requests sent while the platforms register their entities."""
+    async_forward_entry_setups = hass.config_entries.async_forward_entry_setups
+
+    async def _async_forward_entry_setups(entry, platforms):
+        sent = cloud.total_requests
+        await async_forward_entry_setups(entry, platforms)
+        counts.append(cloud.total_requests - sent)
+
+    hass.config_entries.async_forward_entry_setups = _async_forward_entry_setups
+
+
+async def async_measure_setup(args: argparse.Namespace) -> dict:
+    """Set up a config entry ``args.runs`` times against the fake cloud."""
+    cloud = FakeVeSyncCloud(
+        latency=args.latency,
+        seed=0,
+        **{kind: getattr(args, kind) for kind in DEVICE_MODELS},
+    )
+    point_at(await cloud.start())
+    # Write the inventory as soon as devices are found.
+    inventory.SAVE_DELAY = 0
+    if args.update_before_add:
+        _update_before_add()
+    setup_times, requests, registration_requests = [], [], []
+    warm_setup_times, forwarded = [], []
+    for _ in range(args.runs):
+        cloud.reset_counters()
+        with tempfile.TemporaryDirectory() as config_dir:
+            hass = await async_start_hass(config_dir)
+            _count_registration_requests(hass, cloud, forwarded)
+            entry = ConfigEntry(
+                version=1,
+                domain=DOMAIN,
+                title="benchmark",
+                data={CONF_USERNAME: "bench@example.com", CONF_PASSWORD: "secret"},
+                source="user",
+                options=args.options,
+            )
+            started = time.perf_counter()
+            await hass.config_entries.async_add(entry)
+            await hass.async_block_till_done()
+            setup_times.append(time.perf_counter() - started)
+            requests.append(cloud.total_requests)
+            registration_requests.append(forwarded[-1])
+            platforms = sorted(p.domain for p in async_get_platforms(hass, DOMAIN))
+            entities = len(hass.states.async_all())
+            await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_block_till_done()
+
+            # Entities are created from the stored inventory, the cloud is
+            # reached in the background.
+            started = time.perf_counter()
+            await hass.config_entries.async_setup(entry.entry_id)
+            warm_setup_times.append(time.perf_counter() - started)
+            await hass.async_block_till_done()
+            await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_stop(force=True)
+    await cloud.stop()
+    return {
+        "devices": len(cloud.devices),
+        "entities": entities,
+        "platforms_loaded": platforms,
+        "setup_seconds_median": round(statistics.median(setup_times), 3),
+        "setup_requests": requests[-1],
+        "registration_requests": registration_requests[-1],
+        "warm_setup_seconds_median": round(statistics.median(warm_setup_times), 3),
+    }
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    for kind in DEVICE_MODELS:
+        parser.add_argument(f"--{kind.replace('_', '-')}", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--update-before-add",
+        action="store_true",
+        help="update each entity before adding it, like older versions",
+    )
+    parser.add_argument(
+        "--options", type=json.loads, default={}, help="config entry options (JSON)"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = _parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    print(
+        json.dumps(
+            {
+                "import": measure_import(
+                    ["custom_components.vesync"]
+                    + [f"custom_components.vesync.{p}" for p in PLATFORMS],
+                    arguments.runs,
+                ),
+                "setup": asyncio.run(async_measure_setup(arguments)),
+            },
+            indent=2,
+        )
+    )
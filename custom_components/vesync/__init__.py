@@ -1,30 +1,41 @@
 """VeSync integration."""
+import asyncio
 import logging
-from datetime import timedelta
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME, Platform
-from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.core import HomeAssistant, ServiceCall, callback
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.dispatcher import async_dispatcher_send
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
-from pyvesync.vesync import VeSync
 
-from .common import async_process_devices
+from .api import VeSyncClient, async_import_pyvesync
+from .common import async_process_devices, device_unique_id
 from .const import (
+    CONF_BACKGROUND_DISCOVERY,
+    CONF_DETAIL_SENSORS,
+    CONF_DIAGNOSTIC_SENSORS,
+    CONF_MAX_CONCURRENCY,
+    DEFAULT_MAX_CONCURRENCY,
     DOMAIN,
     SERVICE_UPDATE_DEVS,
     VS_BINARY_SENSORS,
     VS_BUTTON,
+    VS_CLIENT,
     VS_DISCOVERY,
     VS_FANS,
     VS_HUMIDIFIERS,
     VS_LIGHTS,
     VS_MANAGER,
     VS_NUMBERS,
+    VS_OPTIONS,
+    VS_PLATFORMS,
     VS_SENSORS,
     VS_SWITCHES,
 )
+from .coordinator import VeSyncDataUpdateCoordinator
+from .energy import VeSyncEnergyStatistics
+from .inventory import VeSyncInventory
 
 PLATFORMS = {
     Platform.SWITCH: VS_SWITCHES,
@@ -49,84 +60,172 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
 
     time_zone = str(hass.config.time_zone)
 
-    manager = VeSync(username, password, time_zone)
+    await async_import_pyvesync(hass)
 
-    login = await hass.async_add_executor_job(manager.login)
+    @callback
+    def _async_save_session(session: dict) -> None:
+        """Store a new login session in the config entry."""
+        hass.config_entries.async_update_entry(
+            config_entry, data={**config_entry.data, **session}
+        )
 
-    if not login:
-        _LOGGER.error("Unable to login to the VeSync server")
-        return False
-
-    forward_setup = hass.config_entries.async_forward_entry_setup
-
-    hass.data[DOMAIN] = {config_entry.entry_id: {}}
+    client = VeSyncClient(
+        hass,
+        username,
+        password,
+        time_zone,
+        config_entry.options.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY),
+        _async_save_session,
+    )
+    manager = client.manager
+    config_entry.async_on_unload(client.shutdown)
+
+    # Reuse the token from the last login, it is renewed when the cloud
+    # rejects it. With the devices found last time, entities are created
+    # right away and the cloud is only reached in the background.
+    inventory = VeSyncInventory(hass, config_entry.entry_id)
+    records = await inventory.async_load()
+    if not client.restore_session(config_entry.data):
+        records = []
+        if not await client.async_login():
+            _LOGGER.error("Unable to login to the VeSync server")
+            return False
+
+    # Entries added before they had a unique ID get the one of their account,
+    # so the account cannot be added a second time.
+    if config_entry.unique_id is None:
+        hass.config_entries.async_update_entry(config_entry, unique_id=client.unique_id)
+
+    # Each account has its own config entry.
+    hass.data.setdefault(DOMAIN, {})[config_entry.entry_id] = {}
     hass.data[DOMAIN][config_entry.entry_id][VS_MANAGER] = manager
+    hass.data[DOMAIN][config_entry.entry_id][VS_CLIENT] = client
+    hass.data[DOMAIN][config_entry.entry_id][VS_OPTIONS] = dict(config_entry.options)
+    for vs_p in PLATFORMS.values():
+        hass.data[DOMAIN][config_entry.entry_id][vs_p] = []
 
-    # Create a DataUpdateCoordinator for the manager
-    async def async_update_data():
-        """Fetch data from API endpoint."""
-        try:
-            await hass.async_add_executor_job(manager.update)
-        except Exception as err:
-            raise UpdateFailed(f"Update failed: {err}")
+    loaded_platforms: set[Platform] = set()
+    hass.data[DOMAIN][config_entry.entry_id][VS_PLATFORMS] = loaded_platforms
+    # Platforms found during the first refresh are set up together after it.
+    pending_platforms: list[Platform] | None = []
+
+    async def async_devices_changed(added: list, removed: list) -> None:
+        """Add entities for new devices and remove the ones of removed devices."""
+        entry_data = hass.data[DOMAIN][config_entry.entry_id]
+        if removed:
+            device_registry = dr.async_get(hass)
+            for device in removed:
+                _LOGGER.info("Device %s was removed", device.device_name)
+                for vs_p in PLATFORMS.values():
+                    if device in entry_data[vs_p]:
+                        entry_data[vs_p].remove(device)
+                if device_entry := device_registry.async_get_device(
+                    {(DOMAIN, device_unique_id(device))}
+                ):
+                    device_registry.async_update_device(
+                        device_entry.id, remove_config_entry_id=config_entry.entry_id
+                    )
 
-    coordinator = DataUpdateCoordinator(
+        inventory.async_save(client.device_list, coordinator.devices)
+        if not added:
+            return
+        dev_dict = await async_process_devices(hass, coordinator.devices, added)
+        new_platforms = []
+        for p, vs_p in PLATFORMS.items():
+            if not (new_devices := dev_dict[vs_p]):
+                continue
+            entry_data[vs_p].extend(new_devices)
+            if p in loaded_platforms:
+                async_dispatcher_send(
+                    hass,
+                    VS_DISCOVERY.format(config_entry.entry_id, vs_p),
+                    new_devices,
+                )
+            else:
+                loaded_platforms.add(p)
+                new_platforms.append(p)
+        if pending_platforms is not None:
+            pending_platforms.extend(new_platforms)
+        elif new_platforms:
+            hass.async_create_task(
+                hass.config_entries.async_forward_entry_setups(
+                    config_entry, new_platforms
+                )
+            )
+
+    coordinator = VeSyncDataUpdateCoordinator(
         hass,
-        _LOGGER,
-        name="vesync",
-        update_method=async_update_data,
-        update_interval=timedelta(seconds=30),
+        client,
+        config_entry.options.get(CONF_BACKGROUND_DISCOVERY, True),
+        config_entry.options.get(CONF_DETAIL_SENSORS, False),
+        async_devices_changed,
+        VeSyncEnergyStatistics(hass, time_zone),
     )
-
-    # Fetch initial data so we have data when entities subscribe
-    await coordinator.async_refresh()
+    config_entry.async_on_unload(coordinator.async_cancel)
 
     # Store the coordinator instance in hass.data
     hass.data[DOMAIN][config_entry.entry_id]["coordinator"] = coordinator
 
-    device_dict = await async_process_devices(hass, manager)
+    if records:
+        await coordinator.async_restore(records)
+        config_entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh"
+        )
+    else:
+        # Fetch initial data so we have data when entities subscribe
+        await coordinator.async_refresh()
+
+    if (
+        config_entry.options.get(CONF_DIAGNOSTIC_SENSORS, False)
+        and Platform.SENSOR not in loaded_platforms
+    ):
+        loaded_platforms.add(Platform.SENSOR)
+        pending_platforms.append(Platform.SENSOR)
+    platforms, pending_platforms = pending_platforms, None
+    await hass.config_entries.async_forward_entry_setups(config_entry, platforms)
+
+    if not hass.services.has_service(DOMAIN, SERVICE_UPDATE_DEVS):
+
+        async def async_new_device_discovery(service: ServiceCall) -> None:
+            """Discover if new devices should be added, in every account."""
+            await asyncio.gather(
+                *(
+                    entry_data["coordinator"].async_refresh_device_list()
+                    for entry_data in hass.data[DOMAIN].values()
+                    if "coordinator" in entry_data
+                )
+            )
+
+        hass.services.async_register(
+            DOMAIN, SERVICE_UPDATE_DEVS, async_new_device_discovery
+        )
+
+    config_entry.async_on_unload(config_entry.add_update_listener(async_reload_entry))
 
-    for p, vs_p in PLATFORMS.items():
-        hass.data[DOMAIN][config_entry.entry_id][vs_p] = []
-        if device_dict[vs_p]:
-            hass.data[DOMAIN][config_entry.entry_id][vs_p].extend(device_dict[vs_p])
-            hass.async_create_task(forward_setup(config_entry, p))
-
-    async def async_new_device_discovery(service: ServiceCall) -> None:
-        """Discover if new devices should be added."""
-        manager = hass.data[DOMAIN][config_entry.entry_id][VS_MANAGER]
-        dev_dict = await async_process_devices(hass, manager)
-
-        def _add_new_devices(platform: str) -> None:
-            """Add new devices to hass."""
-            old_devices = hass.data[DOMAIN][config_entry.entry_id][PLATFORMS[platform]]
-            if new_devices := list(
-                set(dev_dict.get(VS_SWITCHES, [])).difference(old_devices)
-            ):
-                old_devices.extend(new_devices)
-                if old_devices:
-                    async_dispatcher_send(
-                        hass, VS_DISCOVERY.format(PLATFORMS[platform]), new_devices
-                    )
-                else:
-                    hass.async_create_task(forward_setup(config_entry, platform))
+    return True
 
-        for k, v in PLATFORMS.items():
-            _add_new_devices(k)
 
-    hass.services.async_register(
-        DOMAIN, SERVICE_UPDATE_DEVS, async_new_device_discovery
-    )
-
-    return True
+async def async_reload_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Reload the config entry when its options change."""
+    # Storing a new login session updates the entry too.
+    if dict(config_entry.options) == hass.data[DOMAIN][config_entry.entry_id].get(
+        VS_OPTIONS
+    ):
+        return
+    await hass.config_entries.async_reload(config_entry.entry_id)
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(
-        entry, list(PLATFORMS.keys())
+        entry, hass.data[DOMAIN][entry.entry_id][VS_PLATFORMS]
     )
     if unload_ok:
         hass.data[DOMAIN].pop(entry.entry_id)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the stored inventory of a removed config entry."""
+    await VeSyncInventory(hass, entry.entry_id).async_remove()
@@ -0,0 +1,558 @@
+"""Asyncio client for the VeSync cloud API."""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from itertools import chain
+
+import async_timeout
+from aiohttp import ClientError
+from homeassistant.const import CONF_TOKEN, EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .common import device_key, list_entry_key, status_in_device_list
+from .const import (
+    BACKOFF_BASE,
+    BACKOFF_MAX,
+    COMMAND_TIMEOUT,
+    CONF_ACCOUNT_ID,
+    CONF_COUNTRY_CODE,
+    DEFAULT_MAX_CONCURRENCY,
+    DOMAIN,
+    MAX_CONCURRENCY_TOTAL,
+    REFRESH_TIMEOUT,
+    REQUEST_BURST,
+    REQUEST_RATE,
+    VS_TOKEN_EXPIRED_CODES,
+)
+from .energy import ENERGY_PERIODS
+from .stats import VeSyncApiStats
+
+_LOGGER = logging.getLogger(__name__)
+
+_LOCAL = threading.local()
+_SYNC_CALL_API: Callable | None = None
+
+DATA_POOL = f"{DOMAIN}_pool"
+LOGIN_API = "/cloud/v1/user/login"
+
+
+async def async_import_pyvesync(hass: HomeAssistant) -> None:
+    """Import pyvesync and all its device modules in the executor."""
+    if "pyvesync.vesync" not in sys.modules:
+        await hass.async_add_executor_job(importlib.import_module, "pyvesync.vesync")
+
+
+def _call_api(api, method, json_object=None, headers=None):
+    """Route a pyvesync request through the client running the current job."""
+    if (job := getattr(_LOCAL, "job", None)) is None:
+        return _SYNC_CALL_API(api, method, json_object, headers)
+    return job.call_api(api, method, json_object, headers)
+
+
+def _route_pyvesync_requests() -> None:
+    """Send the requests of pyvesync's device classes through ``_call_api``."""
+    global _SYNC_CALL_API
+    from pyvesync.helpers import Helpers
+
+    if Helpers.call_api is not _call_api:
+        _SYNC_CALL_API = Helpers.call_api
+        Helpers.call_api = staticmethod(_call_api)
+
+
+def _with_token(data: dict | None, stale: str, token: str) -> dict | None:
+    """Return request headers or body with a stale token replaced."""
+    if not isinstance(data, dict):
+        return data
+    return {
+        key: token if key in ("token", "tk") and value == stale else value
+        for key, value in data.items()
+    }
+
+
+class VeSyncPool:
+    """Worker threads and request limit shared by every account.
+
+    Refreshes and commands each get half of the workers, so commands never
+    wait behind the refreshes of any account.
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY_TOTAL) -> None:
+        """Initialize the pool."""
+        self.executor = ThreadPoolExecutor(
+            max_workers=2 * max_concurrency, thread_name_prefix=DOMAIN
+        )
+        self.refreshes = asyncio.Semaphore(max_concurrency)
+        self.commands = asyncio.Semaphore(max_concurrency)
+        self.requests = asyncio.Semaphore(max_concurrency)
+
+    def shutdown(self) -> None:
+        """Stop the worker threads."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+@callback
+def async_get_pool(hass: HomeAssistant) -> VeSyncPool:
+    """Return the pool shared by every account, creating it the first time."""
+    if (pool := hass.data.get(DATA_POOL)) is None:
+        pool = hass.data[DATA_POOL] = VeSyncPool()
+        hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, callback(lambda _: pool.shutdown())
+        )
+    return pool
+
+
+class VeSyncRequestBudget:
+    """Token bucket shared by every request of an account, with backoff."""
+
+    def __init__(self, rate: float = REQUEST_RATE, burst: int = REQUEST_BURST) -> None:
+        """Initialize the budget."""
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._failures = 0
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def backoff(self) -> float:
+        """Return how many seconds requests are still paused for."""
+        return max(self._blocked_until - time.monotonic(), 0)
+
+    async def async_acquire(self) -> None:
+        """Wait until a request may be sent."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._tokens = min(
+                    self._burst, self._tokens + (now - self._updated) * self._rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    def throttled(self) -> float:
+        """Pause requests after a throttled response, return the pause."""
+        self._failures += 1
+        delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self._failures - 1))
+        delay = random.uniform(delay / 2, delay)
+        self._blocked_until = max(self._blocked_until, time.monotonic() + delay)
+        return delay
+
+    def succeeded(self) -> None:
+        """Reset the backoff after a successful response."""
+        self._failures = 0
+
+
+class _VeSyncJob:
+    """A blocking pyvesync call whose requests run on the event loop."""
+
+    def __init__(self, client: VeSyncClient) -> None:
+        """Initialize the job."""
+        self.client = client
+        self.cancelled = False
+        self.failed = False
+        self._requests: set[Future] = set()
+
+    def run(self, target, *args):
+        """Run the call in a worker thread."""
+        _LOCAL.job = self
+        try:
+            return target(*args)
+        finally:
+            _LOCAL.job = None
+
+    def call_api(self, api: str, method: str, json_object=None, headers=None):
+        """Send a request of the call and wait for its response."""
+        if self.cancelled:
+            raise CancelledError
+        future = asyncio.run_coroutine_threadsafe(
+            self.client.async_call_api(api, method, json_object, headers),
+            self.client.hass.loop,
+        )
+        self._requests.add(future)
+        if self.cancelled:
+            future.cancel()
+        try:
+            response, status = future.result()
+        finally:
+            self._requests.discard(future)
+        # Some endpoints, like the 7A outlet details, answer without a code.
+        if not isinstance(response, dict) or response.get("code", 0) != 0:
+            self.failed = True
+        return response, status
+
+    def cancel(self) -> None:
+        """Abort the requests in flight, freeing the worker thread."""
+        self.cancelled = True
+        for future in list(self._requests):
+            future.cancel()
+
+
+class VeSyncClient:
+    """Drive a pyvesync manager over the Home Assistant aiohttp session.
+
+    Login and the device list are fetched natively. Per-device detail calls
+    and commands still go through pyvesync's device classes, but they run in
+    the worker threads shared by every account with their requests routed
+    onto the event loop. Refreshes and commands of an account each run at
+    most ``max_concurrency`` at a time, so a burst of commands never waits
+    behind a refresh.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        username: str,
+        password: str,
+        time_zone: str,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        on_login: Callable[[dict], None] | None = None,
+    ) -> None:
+        """Initialize the client."""
+        from pyvesync.vesync import VeSync
+
+        _route_pyvesync_requests()
+        self.hass = hass
+        self.manager = VeSync(username, password, time_zone)
+        self._session = async_get_clientsession(hass)
+        self._pool = async_get_pool(hass)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._command_semaphore = asyncio.Semaphore(max_concurrency)
+        self._jobs: set[_VeSyncJob] = set()
+        self._on_login = on_login
+        self._login_lock = asyncio.Lock()
+        self.stats = VeSyncApiStats()
+        self.budget = VeSyncRequestBudget()
+        self._device_list_hash: int | None = None
+        # Entries of the last device list, for the stored inventory.
+        self.device_list: list[dict] = []
+
+    @property
+    def session(self) -> dict:
+        """Return the login session, to be stored and restored later."""
+        return {
+            CONF_TOKEN: self.manager.token,
+            CONF_ACCOUNT_ID: self.manager.account_id,
+            CONF_COUNTRY_CODE: self.manager.country_code,
+        }
+
+    @property
+    def unique_id(self) -> str:
+        """Return the unique ID of the account, once logged in."""
+        return f"{self.manager.username}-{self.manager.account_id}"
+
+    def restore_session(self, session: dict) -> bool:
+        """Reuse a stored login session instead of logging in."""
+        if not session.get(CONF_TOKEN) or not session.get(CONF_ACCOUNT_ID):
+            return False
+        self.manager.token = session[CONF_TOKEN]
+        self.manager.account_id = session[CONF_ACCOUNT_ID]
+        self.manager.country_code = session.get(CONF_COUNTRY_CODE)
+        self.manager.enabled = True
+        return True
+
+    @property
+    def devices(self) -> list:
+        """Return every device known to the manager."""
+        return list(chain(*self.manager._dev_list.values()))
+
+    async def async_call_api(
+        self, api: str, method: str, json_object=None, headers=None
+    ) -> tuple:
+        """Call the API, returning ``(response, status_code)`` like pyvesync.
+
+        A request refused because the token expired is sent once more with a
+        new token.
+        """
+        token = self.manager.token
+        response, status = await self._async_request(api, method, json_object, headers)
+        if (
+            api != LOGIN_API
+            and isinstance(response, dict)
+            and response.get("code") in VS_TOKEN_EXPIRED_CODES
+            and await self._async_renew_token(token)
+        ):
+            self.stats.record_retry(f"{api} after login")
+            response, status = await self._async_request(
+                api,
+                method,
+                _with_token(json_object, token, self.manager.token),
+                _with_token(headers, token, self.manager.token),
+            )
+        return response, status
+
+    async def _async_renew_token(self, stale: str) -> bool:
+        """Log in again unless another request already did."""
+        async with self._login_lock:
+            if self.manager.token != stale:
+                return True
+            return await self.async_login()
+
+    async def _async_request(
+        self, api: str, method: str, json_object=None, headers=None
+    ) -> tuple:
+        """Send a single request, returning ``(response, status_code)``."""
+        from pyvesync import helpers
+
+        await self.budget.async_acquire()
+        started = time.monotonic()
+        response, status, error = None, None, None
+        try:
+            async with self._pool.requests, async_timeout.timeout(helpers.API_TIMEOUT):
+                async with self._session.request(
+                    method,
+                    helpers.API_BASE_URL + api,
+                    json=json_object,
+                    headers=headers,
+                ) as resp:
+                    if resp.status != 200:
+                        _LOGGER.debug(
+                            "Unable to fetch %s%s: %s",
+                            helpers.API_BASE_URL,
+                            api,
+                            resp.status,
+                        )
+                        error = f"HTTP {resp.status}"
+                        if resp.status == 429 or resp.status >= 500:
+                            pause = self.budget.throttled()
+                            _LOGGER.warning(
+                                "VeSync answered %s, pausing requests for %.0f s",
+                                resp.status,
+                                pause,
+                            )
+                    else:
+                        self.budget.succeeded()
+                        response, status = await resp.json(content_type=None), 200
+        except (asyncio.TimeoutError, ClientError, ValueError) as err:
+            _LOGGER.debug("Error calling %s: %s", api, err)
+            error = type(err).__name__
+        if isinstance(response, dict) and response.get("code", 0) != 0:
+            error = f"code {response['code']}"
+        self.stats.record_call(
+            api, json_object, time.monotonic() - started, error=error
+        )
+        return response, status
+
+    async def async_add_executor_job(self, target, *args, timeout=None):
+        """Run a blocking pyvesync call in the shared worker threads."""
+        return await self._async_run_job(
+            _VeSyncJob(self), target, *args, timeout=timeout
+        )
+
+    async def _async_run_job(self, job: _VeSyncJob, target, *args, timeout=None):
+        """Run ``job`` in the shared worker threads.
+
+        When the call times out or is cancelled its requests are aborted so
+        the worker thread is released.
+        """
+        future = self.hass.loop.run_in_executor(
+            self._pool.executor, job.run, target, *args
+        )
+        self._jobs.add(job)
+        try:
+            async with async_timeout.timeout(timeout):
+                return await future
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            job.cancel()
+            raise
+        finally:
+            self._jobs.discard(job)
+
+    async def async_run_command(self, target, *args):
+        """Send a command, waiting at most COMMAND_TIMEOUT seconds."""
+        async with async_timeout.timeout(COMMAND_TIMEOUT):
+            async with self._command_semaphore, self._pool.commands:
+                return await self.async_add_executor_job(target, *args)
+
+    def shutdown(self) -> None:
+        """Abort the calls of the account, the worker threads are shared."""
+        for job in list(self._jobs):
+            job.cancel()
+
+    async def async_login(self) -> bool:
+        """Log in and store the token on the manager."""
+        from pyvesync.helpers import Helpers
+
+        manager = self.manager
+        if not manager.username or not manager.password:
+            _LOGGER.error("Username or password invalid")
+            return False
+
+        response, _ = await self.async_call_api(
+            LOGIN_API,
+            "post",
+            json_object=Helpers.req_body(manager, "login"),
+        )
+        if not Helpers.code_check(response) or "result" not in response:
+            _LOGGER.error("Error logging in with username and password")
+            return False
+
+        result = response["result"]
+        manager.token = result.get("token")
+        manager.account_id = result.get("accountID")
+        manager.country_code = result.get("countryCode")
+        manager.enabled = True
+        if self._on_login is not None:
+            self._on_login(self.session)
+        return True
+
+    async def async_get_devices(self) -> bool:
+        """Fetch the device list and let the manager (re)build its devices.
+
+        Known devices get the name and power and connection status from the
+        list. Return True if the list changed since the last successful fetch.
+        """
+        from pyvesync.helpers import Helpers
+
+        manager = self.manager
+        response = await self._async_get_device_list()
+        if not Helpers.code_check(response) or "list" not in (
+            response.get("result") or {}
+        ):
+            _LOGGER.warning("Error retrieving device list")
+            return False
+
+        device_list = response["result"]["list"]
+        list_hash = hash(json.dumps(device_list, sort_keys=True))
+        if list_hash == self._device_list_hash:
+            return False
+        # Some device classes query the API from their constructor. The list
+        # is filtered in place down to the new devices, hand over a copy.
+        if not await self.async_add_executor_job(
+            manager.process_devices, list(device_list)
+        ):
+            return False
+        self._device_list_hash = list_hash
+        self.device_list = device_list
+        self._apply_device_list(device_list)
+        return True
+
+    async def async_restore_devices(self, records: list[dict]) -> list:
+        """Create the devices of a stored inventory without calling the cloud.
+
+        They stay unavailable until the device list reports their status.
+        """
+        device_list = [
+            {**record["device"], "connectionStatus": "unknown"} for record in records
+        ]
+        if not await self.async_add_executor_job(
+            self.manager.process_devices, list(device_list)
+        ):
+            return []
+        self.device_list = [record["device"] for record in records]
+        stored = {list_entry_key(record["device"]): record for record in records}
+        for device in self.devices:
+            if (record := stored.get(device_key(device))) is None:
+                continue
+            for attribute in ("details", "config"):
+                if isinstance(record.get(attribute), dict) and isinstance(
+                    getattr(device, attribute, None), dict
+                ):
+                    getattr(device, attribute).update(record[attribute])
+        return self.devices
+
+    def _apply_device_list(self, device_list: list) -> None:
+        """Apply the names and status reported in the device list."""
+        # pyvesync keeps the devices it already knows untouched.
+        devices = {device_key(dev): dev for dev in self.devices}
+        for item in device_list:
+            if (device := devices.get(list_entry_key(item))) is None:
+                continue
+            if item.get("deviceName") and device.device_name != item["deviceName"]:
+                _LOGGER.debug(
+                    "Device %s renamed to %s", device.device_name, item["deviceName"]
+                )
+                device.device_name = item["deviceName"]
+            if item.get("connectionStatus"):
+                device.connection_status = item["connectionStatus"]
+            if item.get("deviceStatus") and status_in_device_list(device):
+                device.device_status = item["deviceStatus"]
+            # The coordinator keeps air fryers up to date, pyvesync would
+            # fetch their status again before every command.
+            if hasattr(device, "refresh_interval"):
+                device.refresh_interval = -1
+
+    async def _async_get_device_list(self) -> dict | None:
+        """Request the device list."""
+        from pyvesync.helpers import Helpers
+
+        response, _ = await self.async_call_api(
+            "/cloud/v1/deviceManaged/devices",
+            "post",
+            headers=Helpers.req_header_bypass(),
+            json_object=Helpers.req_body(self.manager, "devicelist"),
+        )
+        return response
+
+    async def _async_update_device(self, device) -> bool:
+        """Refresh the details of a single device, return False on error.
+
+        Each device has its own deadline, a device that hangs or raises
+        does not hold back the others.
+        """
+        job = _VeSyncJob(self)
+        async with self._semaphore, self._pool.refreshes:
+            try:
+                await self._async_run_job(job, device.update, timeout=REFRESH_TIMEOUT)
+            except asyncio.TimeoutError:
+                _LOGGER.debug("Timed out refreshing %s", device.device_name)
+                return False
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.debug("Error refreshing %s", device.device_name, exc_info=True)
+                return False
+        return not job.failed
+
+    async def async_update_devices(self, devices) -> list:
+        """Refresh the details of ``devices`` concurrently.
+
+        Return the devices that could not be refreshed, pyvesync keeps
+        their previous data.
+        """
+        results = await asyncio.gather(*(self._async_update_device(d) for d in devices))
+        return [dev for dev, success in zip(devices, results) if not success]
+
+    async def _async_update_energy(self, outlet, period: str) -> None:
+        """Refresh one period of the energy history of an outlet.
+
+        A failed request leaves the previous history in place.
+        """
+        async with self._semaphore, self._pool.refreshes:
+            try:
+                await self.async_add_executor_job(
+                    getattr(outlet, ENERGY_PERIODS[period]), timeout=REFRESH_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                _LOGGER.debug("Timed out fetching the energy of %s", outlet.device_name)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.debug(
+                    "Error fetching the energy of %s", outlet.device_name, exc_info=True
+                )
+
+    async def async_update_energy(self, histories) -> None:
+        """Refresh the ``(outlet, period)`` energy histories concurrently."""
+        await asyncio.gather(*(self._async_update_energy(*h) for h in histories))
+
+    async def async_update(self) -> None:
+        """Refresh the device list, then every device's details concurrently."""
+        if not self.manager.enabled:
+            _LOGGER.error("Not logged in to VeSync")
+            return
+
+        await self.async_get_devices()
+        await self.async_update_devices(self.devices)
@@ -1,15 +1,25 @@
 """Support for power & energy sensors for VeSync outlets."""
-import logging
+from __future__ import annotations
 
-from homeassistant.components.binary_sensor import BinarySensorEntity
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Any
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .common import VeSyncBaseEntity, has_feature
-from .const import BINARY_SENSOR_TYPES_AIRFRYER, DOMAIN, VS_BINARY_SENSORS, VS_DISCOVERY
+from .capabilities import KIND_AIRFRYER, VeSyncCapabilities
+from .common import VeSyncDescribedEntity
+from .const import DOMAIN, VS_BINARY_SENSORS, VS_DISCOVERY
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,7 +39,11 @@ async def async_setup_entry(
         _setup_entities(devices, async_add_entities, coordinator)
 
     config_entry.async_on_unload(
-        async_dispatcher_connect(hass, VS_DISCOVERY.format(VS_BINARY_SENSORS), discover)
+        async_dispatcher_connect(
+            hass,
+            VS_DISCOVERY.format(config_entry.entry_id, VS_BINARY_SENSORS),
+            discover,
+        )
     )
 
     _setup_entities(
@@ -44,107 +58,81 @@ def _setup_entities(devices, async_add_entities, coordinator):
     """Check if device is online and add entity."""
     entities = []
     for dev in devices:
-        if hasattr(dev, "fryer_status"):
-            for stype in BINARY_SENSOR_TYPES_AIRFRYER.values():
-                entities.append(
-                    VeSyncairfryerSensor(
-                        dev,
-                        coordinator,
-                        stype,
-                    )
-                )
-        if has_feature(dev, "details", "water_lacks"):
-            entities.append(VeSyncOutOfWaterSensor(dev, coordinator))
-        if has_feature(dev, "details", "water_tank_lifted"):
-            entities.append(VeSyncWaterTankLiftedSensor(dev, coordinator))
-
-    async_add_entities(entities, update_before_add=True)
-
-
-class VeSyncairfryerSensor(VeSyncBaseEntity, BinarySensorEntity):
-    """Class representing a VeSyncairfryerSensor."""
-
-    def __init__(self, airfryer, coordinator, stype) -> None:
-        """Initialize the VeSync humidifier device."""
-        super().__init__(airfryer, coordinator)
-        self.airfryer = airfryer
-        self.stype = stype
-
-    @property
-    def entity_category(self):
-        """Return the diagnostic entity category."""
-        return EntityCategory.DIAGNOSTIC
-
-    @property
-    def unique_id(self):
-        """Return unique ID for water tank lifted sensor on device."""
-        return f"{super().unique_id}-" + self.stype[0]
-
-    @property
-    def name(self):
-        """Return sensor name."""
-        return self.stype[1]
-
-    @property
-    def is_on(self) -> bool:
-        """Return a value indicating whether the Humidifier's water tank is lifted."""
-        value = getattr(self.airfryer, self.stype[0], None)
-        return value
-        # return self.smarthumidifier.details["water_tank_lifted"]
-
-    @property
-    def icon(self):
-        """Return the icon to use in the frontend, if any."""
-        return self.stype[2]
-
-
-class VeSyncBinarySensorEntity(VeSyncBaseEntity, BinarySensorEntity):
-    """Representation of a binary sensor describing diagnostics of a VeSync humidifier."""
-
-    def __init__(self, humidifier, coordinator) -> None:
-        """Initialize the VeSync humidifier device."""
-        super().__init__(humidifier, coordinator)
-        self.smarthumidifier = humidifier
-
-    @property
-    def entity_category(self):
-        """Return the diagnostic entity category."""
-        return EntityCategory.DIAGNOSTIC
-
-
-class VeSyncOutOfWaterSensor(VeSyncBinarySensorEntity):
-    """Out of Water Sensor."""
-
-    @property
-    def unique_id(self):
-        """Return unique ID for out of water sensor on device."""
-        return f"{super().unique_id}-out_of_water"
-
-    @property
-    def name(self):
-        """Return sensor name."""
-        return f"{super().name} out of water"
-
-    @property
-    def is_on(self) -> bool:
-        """Return a value indicating whether the Humidifier is out of water."""
-        return self.smarthumidifier.details["water_lacks"]
-
-
-class VeSyncWaterTankLiftedSensor(VeSyncBinarySensorEntity):
-    """Tank Lifted Sensor."""
-
-    @property
-    def unique_id(self):
-        """Return unique ID for water tank lifted sensor on device."""
-        return f"{super().unique_id}-water_tank_lifted"
-
-    @property
-    def name(self):
-        """Return sensor name."""
-        return f"{super().name} water tank lifted"
+        capabilities = coordinator.devices.capabilities(dev)
+        entities.extend(
+            VeSyncBinarySensorEntity(dev, coordinator, description)
+            for description in BINARY_SENSORS
+            if description.exists_fn(capabilities)
+        )
+
+    async_add_entities(entities)
+
+
+@dataclass
+class VeSyncBinarySensorEntityDescriptionMixin:
+    """Required keys of a VeSync binary sensor description."""
+
+    exists_fn: Callable[[VeSyncCapabilities], bool]
+    is_on_fn: Callable[[Any], bool]
+
+
+@dataclass
+class VeSyncBinarySensorEntityDescription(
+    BinarySensorEntityDescription, VeSyncBinarySensorEntityDescriptionMixin
+):
+    """Describe a binary sensor of a VeSync device."""
+
+    entity_category: EntityCategory | None = EntityCategory.DIAGNOSTIC
+
+
+def _is_airfryer(capabilities: VeSyncCapabilities) -> bool:
+    """Return True for air fryers."""
+    return capabilities.kind == KIND_AIRFRYER
+
+
+BINARY_SENSORS: tuple[VeSyncBinarySensorEntityDescription, ...] = (
+    VeSyncBinarySensorEntityDescription(
+        key="is_heating",
+        name="preheating",
+        icon="mdi:pot-steam-outline",
+        exists_fn=_is_airfryer,
+        is_on_fn=attrgetter("is_heating"),
+    ),
+    VeSyncBinarySensorEntityDescription(
+        key="is_cooking",
+        name="cooking",
+        icon="mdi:rice",
+        exists_fn=_is_airfryer,
+        is_on_fn=attrgetter("is_cooking"),
+    ),
+    VeSyncBinarySensorEntityDescription(
+        key="is_running",
+        name="running",
+        icon="mdi:pause",
+        exists_fn=_is_airfryer,
+        is_on_fn=attrgetter("is_running"),
+    ),
+    VeSyncBinarySensorEntityDescription(
+        key="out_of_water",
+        name="out of water",
+        exists_fn=attrgetter("water_lacks"),
+        is_on_fn=lambda device: device.details["water_lacks"],
+    ),
+    VeSyncBinarySensorEntityDescription(
+        key="water_tank_lifted",
+        name="water tank lifted",
+        exists_fn=attrgetter("water_tank_lifted"),
+        is_on_fn=lambda device: device.details["water_tank_lifted"],
+    ),
+)
+
+
+class VeSyncBinarySensorEntity(VeSyncDescribedEntity, BinarySensorEntity):
+    """Representation of a binary sensor of a VeSync device."""
+
+    entity_description: VeSyncBinarySensorEntityDescription
 
     @property
     def is_on(self) -> bool:
-        """Return a value indicating whether the Humidifier's water tank is lifted."""
-        return self.smarthumidifier.details["water_tank_lifted"]
+        """Return the state reported by the device."""
+        return self.entity_description.is_on_fn(self.device)
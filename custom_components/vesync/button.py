@@ -1,28 +1,25 @@
 """Support for VeSync button."""
+from __future__ import annotations
+
 import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from operator import attrgetter, methodcaller
+from typing import Any
 
-from homeassistant.components.button import ButtonEntity
+from homeassistant.components.button import ButtonEntity, ButtonEntityDescription
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .common import VeSyncBaseEntity
+from .capabilities import VeSyncCapabilities
+from .common import VeSyncDescribedEntity
 from .const import DOMAIN, VS_BUTTON, VS_DISCOVERY
 
 _LOGGER = logging.getLogger(__name__)
 
 
-SENSOR_TYPES_CS158 = {
-    # unique_id,name # icon,
-    "end": [
-        "end",
-        "End cooking or preheating ",
-        "mdi:stop",
-    ],
-}
-
-
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -38,7 +35,9 @@ async def async_setup_entry(
         _setup_entities(devices, async_add_entities, coordinator)
 
     config_entry.async_on_unload(
-        async_dispatcher_connect(hass, VS_DISCOVERY.format(VS_BUTTON), discover)
+        async_dispatcher_connect(
+            hass, VS_DISCOVERY.format(config_entry.entry_id, VS_BUTTON), discover
+        )
     )
 
     _setup_entities(
@@ -53,43 +52,47 @@ def _setup_entities(devices, async_add_entities, coordinator):
     """Check if device is online and add entity."""
     entities = []
     for dev in devices:
-        if hasattr(dev, "cook_set_temp"):
-            for stype in SENSOR_TYPES_CS158.values():
-                entities.append(
-                    VeSyncairfryerButton(
-                        dev,
-                        coordinator,
-                        stype,
-                    )
-                )
-
-    async_add_entities(entities, update_before_add=True)
-
-
-class VeSyncairfryerButton(VeSyncBaseEntity, ButtonEntity):
-    """Base class for VeSync switch Device Representations."""
-
-    def __init__(self, airfryer, coordinator, stype) -> None:
-        """Initialize the VeSync humidifier device."""
-        super().__init__(airfryer, coordinator)
-        self.airfryer = airfryer
-        self.stype = stype
-
-    @property
-    def unique_id(self):
-        """Return unique ID for water tank lifted sensor on device."""
-        return f"{super().unique_id}-" + self.stype[0]
-
-    @property
-    def name(self):
-        """Return sensor name."""
-        return self.stype[1]
-
-    @property
-    def icon(self):
-        """Return the icon to use in the frontend, if any."""
-        return self.stype[2]
-
-    def press(self) -> None:
-        """Return True if device is on."""
-        self.airfryer.end()
+        capabilities = coordinator.devices.capabilities(dev)
+        entities.extend(
+            VeSyncButtonEntity(dev, coordinator, description)
+            for description in BUTTONS
+            if description.exists_fn(capabilities)
+        )
+
+    async_add_entities(entities)
+
+
+@dataclass
+class VeSyncButtonEntityDescriptionMixin:
+    """Required keys of a VeSync button description."""
+
+    exists_fn: Callable[[VeSyncCapabilities], bool]
+    press_fn: Callable[[Any], bool]
+
+
+@dataclass
+class VeSyncButtonEntityDescription(
+    ButtonEntityDescription, VeSyncButtonEntityDescriptionMixin
+):
+    """Describe a button of a VeSync device."""
+
+
+BUTTONS: tuple[VeSyncButtonEntityDescription, ...] = (
+    VeSyncButtonEntityDescription(
+        key="end",
+        name="end cooking or preheating",
+        icon="mdi:stop",
+        exists_fn=attrgetter("cook_buttons"),
+        press_fn=methodcaller("end"),
+    ),
+)
+
+
+class VeSyncButtonEntity(VeSyncDescribedEntity, ButtonEntity):
+    """Representation of a button of a VeSync device."""
+
+    entity_description: VeSyncButtonEntityDescription
+
+    async def async_press(self) -> None:
+        """Press the button."""
+        await self.async_send_command(self.entity_description.press_fn, self.device)
@@ -0,0 +1,167 @@
+"""Capabilities of VeSync devices."""
+from __future__ import annotations
+
+from typing import Any
+
+from .const import (
+    DEV_TYPE_TO_HA,
+    VS_AIRFRYER_TYPES,
+    VS_BINARY_SENSORS,
+    VS_BUTTON,
+    VS_FAN_TYPES,
+    VS_FANS,
+    VS_HUMIDIFIERS,
+    VS_HUMIDIFIERS_TYPES,
+    VS_LEVELS,
+    VS_LIGHTS,
+    VS_MODES,
+    VS_NUMBERS,
+    VS_SENSORS,
+    VS_SWITCHES,
+)
+
+KIND_FAN = "fan"
+KIND_HUMIDIFIER = "humidifier"
+KIND_AIRFRYER = "airfryer"
+
+
+def _has(device, dictionary: str, attribute: str) -> bool:
+    """Return True if the device reports the attribute."""
+    return getattr(device, dictionary, {}).get(attribute, None) is not None
+
+
+class VeSyncCapabilities:
+    """What a device supports, computed from its model and first details."""
+
+    __slots__ = (
+        "kind",
+        "module",
+        "outlet",
+        "light_switch",
+        "dimmable",
+        "tunable_white",
+        "night_light",
+        "night_light_brightness",
+        "auto_mode",
+        "automatic_stop",
+        "display",
+        "child_lock",
+        "water_lacks",
+        "water_tank_lifted",
+        "humidity",
+        "air_quality",
+        "air_quality_value",
+        "filter_life",
+        "mist_level",
+        "target_humidity",
+        "warm_mist_level",
+        "fan_levels",
+        "fan_modes",
+        "cook_buttons",
+        "platforms",
+    )
+
+    def __init__(self, device) -> None:
+        """Probe the device."""
+        from pyvesync.vesyncfan import fan_modules
+        from pyvesync.vesyncfan import model_features as fan_model_features
+        from pyvesync.vesynckitchen import kitchen_modules
+        from pyvesync.vesynckitchen import model_features as kitchen_model_features
+
+        self.kind = DEV_TYPE_TO_HA.get(device.device_type)
+        self.module = None
+        if device.device_type in kitchen_modules:
+            self.module = kitchen_model_features(device.device_type)["module"]
+            if self.module in VS_AIRFRYER_TYPES:
+                self.kind = KIND_AIRFRYER
+        elif device.device_type in fan_modules:
+            # VeSync classifies humidifiers as fans
+            self.module = fan_model_features(device.device_type)["module"]
+            if self.module in VS_HUMIDIFIERS_TYPES:
+                self.kind = KIND_HUMIDIFIER
+            elif self.module in VS_FAN_TYPES:
+                self.kind = KIND_FAN
+
+        self.outlet = self.kind == "outlet"
+        self.light_switch = self.kind == "switch"
+        self.dimmable = self.kind in ("walldimmer", "bulb-dimmable")
+        self.tunable_white = self.kind == "bulb-tunable-white"
+        self.night_light = bool(getattr(device, "night_light", None))
+        self.night_light_brightness = _has(device, "details", "night_light_brightness")
+        self.auto_mode = bool(getattr(device, "set_auto_mode", None))
+        self.automatic_stop = bool(getattr(device, "automatic_stop_on", None))
+        self.display = bool(getattr(device, "turn_on_display", None))
+        self.child_lock = bool(getattr(device, "child_lock_on", None))
+        self.water_lacks = _has(device, "details", "water_lacks")
+        self.water_tank_lifted = _has(device, "details", "water_tank_lifted")
+        self.humidity = _has(device, "details", "humidity")
+        self.air_quality = _has(device, "details", "air_quality")
+        self.air_quality_value = _has(device, "details", "air_quality_value")
+        self.filter_life = _has(device, "details", "filter_life")
+        self.mist_level = _has(device, "details", "mist_virtual_level")
+        self.target_humidity = _has(device, "config", "auto_target_humidity")
+        self.warm_mist_level = _has(device, "details", "warm_mist_level")
+        config_dict = getattr(device, "config_dict", {})
+        self.fan_levels = tuple(config_dict.get(VS_LEVELS) or ())
+        self.fan_modes = tuple(config_dict.get(VS_MODES) or ())
+        self.cook_buttons = hasattr(device, "cook_set_temp")
+        self.platforms = self._platforms()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the capabilities, to be stored."""
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["fan_levels"] = list(self.fan_levels)
+        data["fan_modes"] = list(self.fan_modes)
+        data["platforms"] = sorted(self.platforms)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> VeSyncCapabilities:
+        """Return stored capabilities, raise KeyError if some are missing."""
+        capabilities = cls.__new__(cls)
+        for name in cls.__slots__:
+            setattr(capabilities, name, data[name])
+        capabilities.fan_levels = tuple(data["fan_levels"])
+        capabilities.fan_modes = tuple(data["fan_modes"])
+        capabilities.platforms = frozenset(data["platforms"])
+        return capabilities
+
+    def _platforms(self) -> frozenset[str]:
+        """Return the platforms that have entities for the device."""
+        if self.kind in (KIND_FAN, KIND_HUMIDIFIER):
+            platforms = {VS_FANS if self.kind == KIND_FAN else VS_HUMIDIFIERS}
+        elif self.kind == KIND_AIRFRYER:
+            platforms = {VS_SENSORS, VS_BINARY_SENSORS}
+        elif self.outlet:
+            # Expose outlets' power & energy usage as separate sensors
+            platforms = {VS_SWITCHES, VS_SENSORS}
+        elif self.light_switch:
+            platforms = {VS_SWITCHES}
+        elif self.dimmable or self.tunable_white:
+            platforms = {VS_LIGHTS}
+        else:
+            return frozenset()
+
+        if self.night_light:
+            platforms.add(VS_LIGHTS)
+        if self.auto_mode or self.automatic_stop or self.display or self.child_lock:
+            platforms.add(VS_SWITCHES)
+        if self.water_lacks or self.water_tank_lifted:
+            platforms.add(VS_BINARY_SENSORS)
+        if (
+            self.humidity
+            or self.air_quality
+            or self.air_quality_value
+            or self.filter_life
+        ):
+            platforms.add(VS_SENSORS)
+        if (
+            self.mist_level
+            or self.target_humidity
+            or self.warm_mist_level
+            or self.fan_levels
+        ):
+            platforms.add(VS_NUMBERS)
+        if self.cook_buttons:
+            platforms.add(VS_BUTTON)
+        return frozenset(platforms)
@@ -1,38 +1,148 @@
 """Common utilities for VeSync Component."""
+import asyncio
 import logging
 
 from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity import Entity, ToggleEntity
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from pyvesync.vesyncfan import model_features as fan_model_features
-from pyvesync.vesynckitchen import model_features as kitchen_model_features
 
+from .capabilities import KIND_AIRFRYER, VeSyncCapabilities
 from .const import (
+    ATTR_STALE,
+    DETAIL_SENSOR_ATTRIBUTES,
+    DEV_TYPE_TO_HA,
     DOMAIN,
-    VS_AIRFRYER_TYPES,
     VS_BINARY_SENSORS,
     VS_BUTTON,
-    VS_FAN_TYPES,
     VS_FANS,
     VS_HUMIDIFIERS,
-    VS_HUMIDIFIERS_TYPES,
     VS_LIGHTS,
     VS_NUMBERS,
     VS_SENSORS,
     VS_SWITCHES,
+    VS_TO_HA_ATTRIBUTES,
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+_MISSING = object()
+
+DESCRIPTION_ATTRIBUTES = (
+    "device_class",
+    "entity_category",
+    "entity_registry_enabled_default",
+    "icon",
+    "native_max_value",
+    "native_min_value",
+    "native_step",
+    "native_unit_of_measurement",
+    "state_class",
+)
+
 
 def has_feature(device, dictionary, attribute):
     """Return the detail of the attribute."""
     return getattr(device, dictionary, {}).get(attribute, None) is not None
 
 
-async def async_process_devices(hass, manager):
+def device_key(device) -> tuple:
+    """Return the key identifying a device across device list refreshes."""
+    return (device.cid, device.sub_device_no)
+
+
+def list_entry_key(item: dict) -> tuple:
+    """Return the key of the device described by a device list entry."""
+    return (item.get("cid"), item.get("subDeviceNo", 0))
+
+
+def status_in_device_list(device) -> bool:
+    """Return True if the device list reports whether the device is on."""
+    # Fans and humidifiers are listed as "on" whether they are on or off.
+    return device.device_type in DEV_TYPE_TO_HA
+
+
+def device_unique_id(device) -> str:
+    """Return the ID grouping the entities of a device."""
+    if isinstance(device.sub_device_no, int):
+        return f"{device.cid}{str(device.sub_device_no)}"
+    return device.cid
+
+
+class VeSyncDeviceIndex:
+    """Devices of an account keyed by cid and sub device number."""
+
+    def __init__(self) -> None:
+        """Initialize an empty index."""
+        self._devices: dict[tuple, object] = {}
+        self._capabilities: dict[tuple, VeSyncCapabilities] = {}
+        # Devices probed while their details could not be fetched.
+        self._unprobed: set[tuple] = set()
+
+    def __len__(self) -> int:
+        """Return the number of indexed devices."""
+        return len(self._devices)
+
+    def get(self, key: tuple):
+        """Return the device with ``key``, if any."""
+        return self._devices.get(key)
+
+    def capabilities(self, device) -> VeSyncCapabilities:
+        """Return what a device supports, probing it the first time."""
+        key = device_key(device)
+        if (capabilities := self._capabilities.get(key)) is None:
+            capabilities = self._capabilities[key] = VeSyncCapabilities(device)
+        return capabilities
+
+    def probed(self, device) -> bool:
+        """Return True if what a device supports was probed from its details."""
+        return device_key(device) not in self._unprobed
+
+    def probe_later(self, devices) -> None:
+        """Probe ``devices`` again after their next successful refresh."""
+        self._unprobed.update(device_key(dev) for dev in devices)
+
+    def reprobe(self, devices) -> tuple[list, list]:
+        """Probe again the refreshed ``devices`` waiting for it.
+
+        Return the devices probed and the ones whose capabilities changed.
+        """
+        probed, changed = [], []
+        for device in devices:
+            if (key := device_key(device)) not in self._unprobed:
+                continue
+            self._unprobed.discard(key)
+            capabilities = VeSyncCapabilities(device)
+            previous = self._capabilities.get(key)
+            if previous is not None and previous.as_dict() != capabilities.as_dict():
+                changed.append(device)
+            self._capabilities[key] = capabilities
+            probed.append(device)
+        return probed, changed
+
+    def restore(self, devices, capabilities: dict[tuple, VeSyncCapabilities]) -> None:
+        """Index devices restored from storage along with what they support."""
+        self._devices = {device_key(dev): dev for dev in devices}
+        self._capabilities = {
+            key: value for key, value in capabilities.items() if key in self._devices
+        }
+        self._unprobed.clear()
+
+    def update(self, devices) -> tuple[list, list]:
+        """Index ``devices``, return the ones added and removed since last time."""
+        current = {device_key(dev): dev for dev in devices}
+        added = [dev for key, dev in current.items() if key not in self._devices]
+        removed = [dev for key, dev in self._devices.items() if key not in current]
+        for device in removed:
+            self._capabilities.pop(device_key(device), None)
+            self._unprobed.discard(device_key(device))
+        self._devices = current
+        return added, removed
+
+
+async def async_process_devices(hass, index, devices):
     """Assign devices to proper component."""
-    devices = {
+    dev_dict = {
         VS_SWITCHES: [],
         VS_FANS: [],
         VS_LIGHTS: [],
@@ -44,8 +154,7 @@ async def async_process_devices(hass, manager):
     }
 
     redacted = async_redact_data(
-        {k: [d.__dict__ for d in v] for k, v in manager._dev_list.items()},
-        ["cid", "uuid", "mac_id"],
+        [d.__dict__ for d in devices], ["cid", "uuid", "mac_id"]
     )
 
     _LOGGER.warning(
@@ -53,71 +162,26 @@ async def async_process_devices(hass, manager):
         redacted,
     )
 
-    if (
-        manager.bulbs is None
-        and manager.fans is None
-        and manager.kitchen is None
-        and manager.outlets is None
-        and manager.switches is None
-    ):
+    if not devices:
         _LOGGER.error("Could not find any device to add in %s", redacted)
 
-    if manager.fans:
-        for fan in manager.fans:
-            # VeSync classifies humidifiers as fans
-            if fan_model_features(fan.device_type)["module"] in VS_HUMIDIFIERS_TYPES:
-                devices[VS_HUMIDIFIERS].append(fan)
-            elif fan_model_features(fan.device_type)["module"] in VS_FAN_TYPES:
-                devices[VS_FANS].append(fan)
-            else:
-                _LOGGER.warning(
-                    "Unknown fan type %s %s (enable debug for more info)",
-                    fan.device_name,
-                    fan.device_type,
-                )
-                continue
-            devices[VS_NUMBERS].append(fan)
-            devices[VS_SWITCHES].append(fan)
-            devices[VS_SENSORS].append(fan)
-            devices[VS_BINARY_SENSORS].append(fan)
-            devices[VS_LIGHTS].append(fan)
-
-    if manager.bulbs:
-        devices[VS_LIGHTS].extend(manager.bulbs)
-
-    if manager.outlets:
-        devices[VS_SWITCHES].extend(manager.outlets)
-        # Expose outlets' power & energy usage as separate sensors
-        devices[VS_SENSORS].extend(manager.outlets)
-
-    if manager.switches:
-        for switch in manager.switches:
-            if not switch.is_dimmable():
-                devices[VS_SWITCHES].append(switch)
-            else:
-                devices[VS_LIGHTS].append(switch)
-
-    if manager.kitchen:
-        for airfryer in manager.kitchen:
-            if (
-                kitchen_model_features(airfryer.device_type)["module"]
-                in VS_AIRFRYER_TYPES
-            ):
-                _LOGGER.warning(
-                    "Found air fryer %s, support in progress.\n%s", airfryer.device_name
-                )
-                devices[VS_SENSORS].append(airfryer)
-                devices[VS_BINARY_SENSORS].append(airfryer)
-                devices[VS_SWITCHES].append(airfryer)
-                devices[VS_BUTTON].append(airfryer)
-            else:
-                _LOGGER.warning(
-                    "Unknown device type %s %s (enable debug for more info)",
-                    airfryer.device_name,
-                    airfryer.device_type,
-                )
+    for device in devices:
+        capabilities = index.capabilities(device)
+        if not capabilities.platforms:
+            _LOGGER.warning(
+                "Unknown device type %s %s (enable debug for more info)",
+                device.device_name,
+                device.device_type,
+            )
+            continue
+        if capabilities.kind == KIND_AIRFRYER:
+            _LOGGER.warning(
+                "Found air fryer %s, support in progress.", device.device_name
+            )
+        for platform in capabilities.platforms:
+            dev_dict[platform].append(device)
 
-    return devices
+    return dev_dict
 
 
 class VeSyncBaseEntity(CoordinatorEntity, Entity):
@@ -127,52 +191,67 @@ class VeSyncBaseEntity(CoordinatorEntity, Entity):
         """Initialize the VeSync device."""
         self.device = device
         super().__init__(coordinator, context=device)
+        # Entities of a device extend base_unique_id and base_name, and are
+        # grouped under a single device.
+        self.base_unique_id = device_unique_id(device)
+        self.base_name = device.device_type
+        self._attr_unique_id = self.base_unique_id
+        self._attr_name = self.base_name
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, self.base_unique_id)},
+            "name": self.base_name,
+            "model": device.device_type,
+            "manufacturer": "VeSync",
+            "sw_version": device.current_firm_version,
+        }
 
     @property
-    def base_unique_id(self):
-        """Return the ID of this device."""
-        if isinstance(self.device.sub_device_no, int):
-            return f"{self.device.cid}{str(self.device.sub_device_no)}"
-        return self.device.cid
+    def available(self) -> bool:
+        """Return True if device is available."""
+        return (
+            self.device.connection_status == "online"
+            and self.coordinator.is_available(self.device)
+        )
 
     @property
-    def unique_id(self):
-        """Return the ID of this device."""
-        # The unique_id property may be overridden in subclasses, such as in sensors. Maintaining base_unique_id allows
-        # us to group related entities under a single device.
-        return self.base_unique_id
+    def device_attributes(self):
+        """Return the state attributes of the device."""
+        return super().extra_state_attributes
 
     @property
-    def base_name(self):
-        """Return the name of the device."""
-        return self.device.device_type
+    def extra_state_attributes(self):
+        """Flag the state as stale when the last refresh of the device failed."""
+        attributes = self.device_attributes
+        if self.coordinator.is_stale(self.device):
+            return {**(attributes or {}), ATTR_STALE: True}
+        return attributes
 
-    @property
-    def name(self):
-        """Return the name of the entity (may be overridden)."""
-        return self.base_name
+    async def async_send_command(self, target, *args):
+        """Send a pyvesync command, then poll the device quickly for a while."""
+        try:
+            result = await self.coordinator.client.async_run_command(target, *args)
+        except asyncio.TimeoutError as err:
+            raise HomeAssistantError(
+                f"Timed out sending a command to {self.device.device_name}"
+            ) from err
+        self.coordinator.async_command_sent(self.device)
+        return result
 
-    @property
-    def available(self) -> bool:
-        """Return True if device is available."""
-        return self.device.connection_status == "online"
 
-    @property
-    def device_info(self):
-        """Return device information."""
-        return {
-            "identifiers": {(DOMAIN, self.base_unique_id)},
-            "name": self.base_name,
-            "model": self.device.device_type,
-            "manufacturer": "VeSync",
-            "sw_version": self.device.current_firm_version,
-        }
+class VeSyncDescribedEntity(VeSyncBaseEntity):
+    """Base class for VeSync entities defined by an entity description."""
 
-    async def async_added_to_hass(self):
-        """When entity is added to hass."""
-        self.async_on_remove(
-            self.coordinator.async_add_listener(self.async_write_ha_state)
-        )
+    def __init__(self, device, coordinator, description) -> None:
+        """Initialize the entity from its description."""
+        super().__init__(device, coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{self.base_unique_id}-{description.key}"
+        self._attr_name = f"{self.base_name} {description.name}"
+        # Entity looks these up on the description at every state write
+        # unless they are set on the entity.
+        for attribute in DESCRIPTION_ATTRIBUTES:
+            if hasattr(description, attribute):
+                setattr(self, f"_attr_{attribute}", getattr(description, attribute))
 
 
 class VeSyncDevice(VeSyncBaseEntity, ToggleEntity):
@@ -187,6 +266,45 @@ class VeSyncDevice(VeSyncBaseEntity, ToggleEntity):
         """Return True if device is on."""
         return self.device.device_status == "on"
 
-    def turn_off(self, **kwargs):
+    async def async_turn_off(self, **kwargs):
         """Turn the device off."""
-        self.device.turn_off()
+        await self.async_send_command(self.device.turn_off)
+
+
+class VeSyncDetailedDevice(VeSyncDevice):
+    """Base class for VeSync devices exposing some details as attributes."""
+
+    # Keys of the device details exposed as state attributes.
+    _detail_attributes: tuple[str, ...] = ()
+
+    def __init__(self, device, coordinator) -> None:
+        """Initialize the VeSync device."""
+        super().__init__(device, coordinator)
+        self._detail_names: dict[str, str] | None = None
+        self._detail_values: tuple = ()
+        self._detail_state: dict = {}
+
+    @property
+    def device_attributes(self):
+        """Return the exposed details, rebuilt only when they change."""
+        if self._detail_names is None:
+            # Details named like an attribute of the entity get a prefix.
+            reserved = {*(self.state_attributes or {}), ATTR_STALE}
+            self._detail_names = {
+                key: VS_TO_HA_ATTRIBUTES.get(key)
+                or (f"vs_{key}" if key in reserved else key)
+                for key in self._detail_attributes
+                if not (
+                    self.coordinator.detail_sensors and key in DETAIL_SENSOR_ATTRIBUTES
+                )
+            }
+        details = self.device.details
+        values = tuple(details.get(key, _MISSING) for key in self._detail_names)
+        if values != self._detail_values:
+            self._detail_values = values
+            self._detail_state = {
+                name: value
+                for name, value in zip(self._detail_names.values(), values)
+                if value is not _MISSING
+            }
+        return self._detail_state
@@ -8,9 +8,16 @@ from homeassistant.components import dhcp
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
-from pyvesync.vesync import VeSync
 
-from .const import DOMAIN
+from .api import VeSyncClient, async_import_pyvesync
+from .const import (
+    CONF_BACKGROUND_DISCOVERY,
+    CONF_DETAIL_SENSORS,
+    CONF_DIAGNOSTIC_SENSORS,
+    CONF_MAX_CONCURRENCY,
+    DEFAULT_MAX_CONCURRENCY,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -28,6 +35,12 @@ class VeSyncFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         self.data_schema[vol.Required(CONF_USERNAME)] = str
         self.data_schema[vol.Required(CONF_PASSWORD)] = str
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Get the options flow for this handler."""
+        return VeSyncOptionsFlowHandler(config_entry)
+
     @callback
     def _show_form(self, errors=None):
         """Show form to the user."""
@@ -39,30 +52,32 @@ class VeSyncFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def async_step_user(self, user_input=None):
         """Handle a flow start."""
-        if self._async_current_entries():
-            return self.async_abort(reason="single_instance_allowed")
-
         if not user_input:
             return self._show_form()
 
         self._username = user_input[CONF_USERNAME]
         self._password = user_input[CONF_PASSWORD]
 
-        manager = VeSync(self._username, self._password)
-        login = await self.hass.async_add_executor_job(manager.login)
-        await self.async_set_unique_id(f"{self._username}-{manager.account_id}")
+        await async_import_pyvesync(self.hass)
+        client = VeSyncClient(
+            self.hass,
+            self._username,
+            self._password,
+            str(self.hass.config.time_zone),
+        )
+        if not await client.async_login():
+            return self._show_form(errors={"base": "invalid_auth"})
+        await self.async_set_unique_id(client.unique_id)
         self._abort_if_unique_id_configured()
 
-        return (
-            self.async_create_entry(
-                title=self._username,
-                data={
-                    CONF_USERNAME: self._username,
-                    CONF_PASSWORD: self._password,
-                },
-            )
-            if login
-            else self._show_form(errors={"base": "invalid_auth"})
+        # Keep the session so that setting up the entry does not log in again.
+        return self.async_create_entry(
+            title=self._username,
+            data={
+                CONF_USERNAME: self._username,
+                CONF_PASSWORD: self._password,
+                **client.session,
+            },
         )
 
     async def async_step_dhcp(self, discovery_info: dhcp.DhcpServiceInfo) -> FlowResult:
@@ -70,5 +85,47 @@ class VeSyncFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         hostname = discovery_info.hostname
 
         _LOGGER.debug("DHCP discovery detected device %s", hostname)
+        # The device most likely belongs to an account already set up.
+        self._async_abort_entries_match()
         self.context["title_placeholders"] = {"gateway_id": hostname}
         return await self.async_step_user()
+
+
+class VeSyncOptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle VeSync options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(self, user_input=None):
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_MAX_CONCURRENCY,
+                        default=options.get(
+                            CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=32)),
+                    vol.Optional(
+                        CONF_DIAGNOSTIC_SENSORS,
+                        default=options.get(CONF_DIAGNOSTIC_SENSORS, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_BACKGROUND_DISCOVERY,
+                        default=options.get(CONF_BACKGROUND_DISCOVERY, True),
+                    ): bool,
+                    vol.Optional(
+                        CONF_DETAIL_SENSORS,
+                        default=options.get(CONF_DETAIL_SENSORS, False),
+                    ): bool,
+                }
+            ),
+        )
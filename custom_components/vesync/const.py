@@ -1,9 +1,7 @@
 """Constants for VeSync Component."""
 
-from homeassistant.const import DEVICE_CLASS_TEMPERATURE, TEMP_CELSIUS, TIME_MINUTES
-
 DOMAIN = "vesync"
-VS_DISCOVERY = "vesync_discovery_{}"
+VS_DISCOVERY = "vesync_discovery_{}_{}"
 SERVICE_UPDATE_DEVS = "update_devices"
 
 VS_BUTTON = "button"
@@ -16,6 +14,71 @@ VS_HUMIDIFIERS = "humidifiers"
 VS_NUMBERS = "numbers"
 VS_BINARY_SENSORS = "binary_sensors"
 VS_MANAGER = "manager"
+VS_CLIENT = "client"
+VS_OPTIONS = "options"
+VS_PLATFORMS = "platforms"
+
+ATTR_STALE = "stale"
+
+CONF_ACCOUNT_ID = "account_id"
+CONF_BACKGROUND_DISCOVERY = "background_discovery"
+CONF_COUNTRY_CODE = "country_code"
+CONF_DETAIL_SENSORS = "detail_sensors"
+CONF_DIAGNOSTIC_SENSORS = "diagnostic_sensors"
+CONF_MAX_CONCURRENCY = "max_concurrency"
+DEFAULT_MAX_CONCURRENCY = 8
+# Response codes of requests refused because the token expired.
+VS_TOKEN_EXPIRED_CODES = (-11012022,)
+# Requests in flight across every account.
+MAX_CONCURRENCY_TOTAL = 16
+
+# Poll intervals in seconds. Each device is polled on its own schedule,
+# picked from its class and current state.
+# The device list also carries the power and connection status of every
+# device, it is swept this often with background discovery.
+DEVICE_LIST_INTERVAL = 30
+POLL_INTERVAL_MIN = 5
+POLL_INTERVAL_OFFLINE = 600
+POLL_INTERVAL_OFF = 300
+POLL_INTERVAL_ON = 30
+POLL_INTERVAL_OUTLET = 60
+POLL_INTERVAL_LIGHT = 120
+POLL_INTERVAL_COOKING = 10
+POLL_INTERVAL_COOK_PAUSED = 30
+# Details of devices that are offline, or of switches, outlets and bulbs that
+# are off, while the device list sweep follows their status.
+POLL_INTERVAL_SWEPT = 1800
+# Seconds before fetching an energy history again after a failed request.
+ENERGY_RETRY_INTERVAL = 900
+# Devices due within this many seconds are polled along with the others,
+# the coordinator's timer does not fire at an exact time.
+POLL_SLACK = 1
+# Poll a device every POLL_INTERVAL_MIN for this long after a command.
+POLL_BURST_DURATION = 30
+# Commands sent within this many seconds replace each other, only the
+# last one reaches the device.
+COMMAND_DEBOUNCE = 0.5
+# Seconds a command may take, including the wait for a free worker.
+COMMAND_TIMEOUT = 20
+# Seconds after a command before the device is refreshed to confirm it,
+# commands sent in the meantime are confirmed by the same refresh.
+COMMAND_REFRESH_DELAY = 1
+# Seconds the refresh of a single device may take once it has a worker.
+REFRESH_TIMEOUT = 30
+# Devices failing this many refreshes in a row become unavailable.
+REFRESH_FAILURES_UNAVAILABLE = 3
+
+# Requests per second shared by polling and commands, and how many can be
+# sent at once after a quiet period.
+REQUEST_RATE = 10
+REQUEST_BURST = 30
+# Pause all requests after a throttled or 5xx response, doubling the pause
+# up to BACKOFF_MAX seconds while they keep failing.
+BACKOFF_BASE = 2
+BACKOFF_MAX = 300
+
+VS_COOKING_STATUSES = ["cooking", "heating"]
+VS_COOK_PAUSED_STATUSES = ["cookStop", "preheatStop", "preheatEnd", "pullOut"]
 
 VS_LEVELS = "levels"
 VS_MODES = "modes"
@@ -27,6 +90,31 @@ VS_MODE_SLEEP = "sleep"
 
 VS_TO_HA_ATTRIBUTES = {"humidity": "current_humidity"}
 
+# Raw detail keys exposed as state attributes. Details that have their own
+# entity (filter life, air quality, water level, mist level...) are left out.
+FAN_DETAIL_ATTRIBUTES = (
+    "active_time",
+    "auto_preference",
+    "auto_preference_type",
+    "display_forever",
+    "environment_light_state",
+    "level",
+    "light_detection",
+    "light_detection_switch",
+    "screen_status",
+    "screen_switch",
+)
+HUMIDIFIER_DETAIL_ATTRIBUTES = (
+    "automatic_stop_reach_target",
+    "humidity",
+    "humidity_high",
+    "mist_level",
+    "mode",
+    "warm_mist_enabled",
+)
+# Details exposed as sensors instead of attributes with CONF_DETAIL_SENSORS.
+DETAIL_SENSOR_ATTRIBUTES = ("active_time", "mist_level")
+
 VS_FAN_TYPES = ["VeSyncAirBypass", "VeSyncAir131", "VeSyncVital"]
 VS_HUMIDIFIERS_TYPES = ["VeSyncHumid200300S", "VeSyncHumid200S", "VeSyncHumid1000S"]
 VS_AIRFRYER_TYPES = ["VeSyncAirFryer158"]
@@ -45,76 +133,3 @@ DEV_TYPE_TO_HA = {
     "ESD16": "walldimmer",
     "ESWD16": "walldimmer",
 }
-
-
-BINARY_SENSOR_TYPES_AIRFRYER = {
-    # unique_id,name # icon, #attribute read,
-    "is_heating": [
-        "is_heating",
-        "preheating",
-        "mdi:pot-steam-outline",
-    ],
-    "is_cooking": [
-        "is_cooking",
-        "cooking",
-        "mdi:rice",
-    ],
-    "is_running": [
-        "is_running",
-        "running",
-        "mdi:pause",
-    ],
-}
-
-
-SENSOR_TYPES_AIRFRYER = {
-    # unique_id ,#name ,# unit of measurement,# icon, # device class, #attribute read,
-    "current_temp": [
-        "current_temperature",
-        "Current temperature",
-        TEMP_CELSIUS,
-        None,
-        DEVICE_CLASS_TEMPERATURE,
-        "current_temp",
-    ],
-    "cook_set_temp": [
-        "set_temperature",
-        "Set temperature",
-        TEMP_CELSIUS,
-        None,
-        DEVICE_CLASS_TEMPERATURE,
-        "cook_set_temp",
-    ],
-    "cook_last_time": [
-        "cook_last_time",
-        "Cook Remaining",
-        TIME_MINUTES,
-        "mdi:timer",
-        TIME_MINUTES,
-        "cook_last_time",
-    ],
-    "preheat_last_time": [
-        "preheat_last_time",
-        "Preheat Remaining",
-        TIME_MINUTES,
-        "mdi:timer",
-        TIME_MINUTES,
-        "preheat_last_time",
-    ],
-    "cook_status": [
-        "cook_status",
-        "Cook Status",
-        None,
-        "mdi:rotate-3d-variant",
-        None,
-        "cook_status",
-    ],
-    # "remaining_time": [
-    #    "remaining_time",
-    #    "running:",
-    #    TIME_MINUTES,
-    #    "mdi:timer",
-    #    TIME_MINUTES,
-    #    "remaining_time",
-    # ],
-}
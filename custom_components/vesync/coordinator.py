@@ -0,0 +1,484 @@
+"""Data update coordinator for the VeSync integration."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+from functools import partial
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .api import VeSyncClient
+from .common import VeSyncDeviceIndex, status_in_device_list
+from .const import (
+    COMMAND_DEBOUNCE,
+    COMMAND_REFRESH_DELAY,
+    DEV_TYPE_TO_HA,
+    DEVICE_LIST_INTERVAL,
+    DOMAIN,
+    POLL_BURST_DURATION,
+    POLL_INTERVAL_COOK_PAUSED,
+    POLL_INTERVAL_COOKING,
+    POLL_INTERVAL_LIGHT,
+    POLL_INTERVAL_MIN,
+    POLL_INTERVAL_OFF,
+    POLL_INTERVAL_OFFLINE,
+    POLL_INTERVAL_ON,
+    POLL_INTERVAL_OUTLET,
+    POLL_INTERVAL_SWEPT,
+    POLL_SLACK,
+    REFRESH_FAILURES_UNAVAILABLE,
+    VS_COOK_PAUSED_STATUSES,
+    VS_COOKING_STATUSES,
+)
+from .energy import VeSyncEnergyHistory, VeSyncEnergyMeter, VeSyncEnergyStatistics
+from .inventory import restore_capabilities
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _snapshot(value):
+    """Return a hashable copy of a device attribute."""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _snapshot(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_snapshot(v) for v in value)
+    if hasattr(value, "__dict__"):
+        return _snapshot(vars(value))
+    return value
+
+
+def fingerprint(device) -> int:
+    """Return a hash of everything pyvesync parsed into a device."""
+    # pyvesync keeps state both in `details`/`config` and in plain
+    # attributes (device_status, enabled, fryer_status...).
+    return hash(_snapshot({k: v for k, v in vars(device).items() if k != "manager"}))
+
+
+def _status(device) -> tuple:
+    """Return the status of a device reported by the device list."""
+    if status_in_device_list(device):
+        return device.connection_status, device.device_status
+    return (device.connection_status,)
+
+
+def _health(failures: int) -> tuple[bool, bool]:
+    """Return whether a device is stale and whether it is available."""
+    return failures > 0, failures < REFRESH_FAILURES_UNAVAILABLE
+
+
+def _is_on(device) -> bool:
+    """Return True if the device is powered on."""
+    # Fans and humidifiers report power through `enabled`, their
+    # device_status stays "on".
+    if (enabled := getattr(device, "enabled", None)) is not None:
+        return bool(enabled)
+    return device.device_status == "on"
+
+
+class VeSyncPollScheduler:
+    """Pick when each device should be polled next."""
+
+    def __init__(self, swept: bool = False) -> None:
+        """Initialize the scheduler.
+
+        With ``swept``, the device list is fetched regularly and reports
+        when devices go offline, and when switches, outlets and bulbs are
+        turned on or off.
+        """
+        self._next_poll: dict = {}
+        self._burst_until: dict = {}
+        self._swept = swept
+
+    def interval(self, device) -> int:
+        """Return the poll interval of a device in its current state."""
+        if device.connection_status != "online":
+            return POLL_INTERVAL_SWEPT if self._swept else POLL_INTERVAL_OFFLINE
+        if hasattr(device, "fryer_status"):
+            if device.cook_status in VS_COOKING_STATUSES:
+                return POLL_INTERVAL_COOKING
+            if device.cook_status in VS_COOK_PAUSED_STATUSES:
+                return POLL_INTERVAL_COOK_PAUSED
+            return POLL_INTERVAL_OFF
+        if not _is_on(device):
+            if self._swept and status_in_device_list(device):
+                return POLL_INTERVAL_SWEPT
+            return POLL_INTERVAL_OFF
+        dev_type = DEV_TYPE_TO_HA.get(device.device_type)
+        if dev_type == "outlet":
+            return POLL_INTERVAL_OUTLET
+        if dev_type is not None:
+            return POLL_INTERVAL_LIGHT
+        return POLL_INTERVAL_ON
+
+    def due(self, devices, now: float) -> list:
+        """Return the devices that should be polled now."""
+        return [
+            dev for dev in devices if self._next_poll.get(dev, 0) <= now + POLL_SLACK
+        ]
+
+    def next_poll(self, devices) -> float | None:
+        """Return when the next device is due."""
+        return min((self._next_poll.get(dev, 0) for dev in devices), default=None)
+
+    def polled(self, device, now: float) -> None:
+        """Schedule the next poll of a device that was just refreshed."""
+        if self._burst_until.get(device, 0) > now:
+            self._next_poll[device] = now + POLL_INTERVAL_MIN
+        else:
+            self._burst_until.pop(device, None)
+            self._next_poll[device] = now + self.interval(device)
+
+    def status_changed(self, device) -> None:
+        """Poll a device now, its details no longer match its status."""
+        self._next_poll.pop(device, None)
+
+    def forget(self, device) -> None:
+        """Drop the schedule of a removed device."""
+        self._next_poll.pop(device, None)
+        self._burst_until.pop(device, None)
+
+    def command_sent(self, device, now: float) -> None:
+        """Poll a device quickly for a while after it was commanded."""
+        self._burst_until[device] = now + POLL_BURST_DURATION
+        self._next_poll[device] = now + POLL_INTERVAL_MIN
+
+
+class VeSyncCommandQueue:
+    """Debounce the commands sent to each device.
+
+    Commands are coroutine functions queued under a key, usually one per
+    device setting. A command queued while an earlier one with the same key
+    still waits replaces it, so dragging a slider only sends the final value.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the queue."""
+        self.hass = hass
+        self._pending: dict = {}
+        self._unsub: dict[tuple, CALLBACK_TYPE] = {}
+
+    @callback
+    def async_queue(
+        self,
+        device,
+        key: str,
+        target: Callable,
+        *args,
+        done: Callable[[bool], None] | None = None,
+    ) -> None:
+        """Await ``target(*args)`` after a short delay unless superseded.
+
+        ``done`` is called with the outcome of the command, unless another
+        one was queued under the same key in the meantime.
+        """
+        self._pending[(device, key)] = (target, args, done)
+        if (device, key) not in self._unsub:
+            self._unsub[(device, key)] = async_call_later(
+                self.hass, COMMAND_DEBOUNCE, partial(self._async_send, device, key)
+            )
+
+    async def _async_send(self, device, key: str, _now) -> None:
+        """Send the last command queued under a key."""
+        del self._unsub[(device, key)]
+        target, args, done = self._pending.pop((device, key))
+        try:
+            success = await target(*args)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error sending command to %s", device.device_name)
+            success = False
+        if done is not None and (device, key) not in self._pending:
+            done(bool(success))
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop the commands that were not sent yet."""
+        for unsub in self._unsub.values():
+            unsub()
+        self._unsub.clear()
+        self._pending.clear()
+
+
+class VeSyncDataUpdateCoordinator(DataUpdateCoordinator):
+    """Refresh each VeSync device on its own adaptive schedule."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: VeSyncClient,
+        background_discovery: bool = True,
+        detail_sensors: bool = False,
+        on_devices_changed: Callable[[list, list], Awaitable[None]] | None = None,
+        statistics: VeSyncEnergyStatistics | None = None,
+    ) -> None:
+        """Initialize the coordinator.
+
+        ``on_devices_changed`` is awaited with the devices added and removed
+        whenever the device list changes. Outlet energy histories are
+        imported into ``statistics`` once a day.
+        """
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=timedelta(seconds=POLL_INTERVAL_MIN),
+        )
+        self.client = client
+        self.scheduler = VeSyncPollScheduler(swept=background_discovery)
+        self.commands = VeSyncCommandQueue(hass)
+        self.devices = VeSyncDeviceIndex()
+        self.meter = VeSyncEnergyMeter(client.manager.time_zone)
+        self.energy = VeSyncEnergyHistory(
+            client.manager.time_zone, self.meter.energy_today
+        )
+        self._background_discovery = background_discovery
+        # Energy totals and some details are sensors rather than attributes.
+        self.detail_sensors = detail_sensors
+        self._on_devices_changed = on_devices_changed
+        self._statistics = statistics
+        self._device_list_lock = asyncio.Lock()
+        self._next_device_list = 0.0
+        self._fingerprints: dict = {}
+        self._changed: set | None = None
+        # Refreshes each device failed in a row.
+        self._failures: dict = {}
+        # Devices commanded since their last refresh.
+        self._commanded: set = set()
+        self._unsub_commanded: CALLBACK_TYPE | None = None
+
+    def is_stale(self, device) -> bool:
+        """Return True if the last refresh of a device failed."""
+        return device in self._failures
+
+    def is_available(self, device) -> bool:
+        """Return False if a device keeps failing to refresh."""
+        return self._failures.get(device, 0) < REFRESH_FAILURES_UNAVAILABLE
+
+    def _record_refreshes(self, devices, failed) -> set:
+        """Count the failed refreshes, return the devices whose health changed."""
+        changed = set()
+        for device in devices:
+            before = self._failures.pop(device, 0)
+            if device in failed:
+                self._failures[device] = before + 1
+            if _health(before) != _health(self._failures.get(device, 0)):
+                changed.add(device)
+        return changed
+
+    async def _async_update_data(self) -> None:
+        """Refresh the devices that are due."""
+        if not self.client.manager.enabled:
+            raise UpdateFailed("Not logged in to VeSync")
+
+        if (backoff := self.client.budget.backoff) > 0:
+            # The cloud is throttling us: keep the last good data and come
+            # back once the pause is over.
+            self.update_interval = timedelta(seconds=max(backoff, POLL_INTERVAL_MIN))
+            self._changed = set()
+            return
+
+        now = started = time.monotonic()
+        devices = []
+        metered = set()
+        try:
+            if now >= self._next_device_list:
+                await self.async_refresh_device_list()
+                self._next_device_list = (
+                    now + DEVICE_LIST_INTERVAL
+                    if self._background_discovery or not self.devices
+                    else math.inf
+                )
+            devices = self.scheduler.due(self.client.devices, now)
+            outlets = [
+                dev for dev in self.client.devices if hasattr(dev, "update_energy")
+            ]
+            # Energy history is shared by the outlet switch and its sensors
+            # and only fetched once a day. Its outlets are refreshed too, so
+            # the energy used today is sampled before the fetch records it.
+            histories = self.energy.due(outlets, dt_util.utcnow())
+            devices.extend({outlet for outlet, _ in histories}.difference(devices))
+            failed = await self.client.async_update_devices(devices)
+            await self._async_reprobe([dev for dev in devices if dev not in failed])
+            # Energy used today is estimated from the power of each outlet
+            # between the updates of the cloud.
+            for outlet in set(outlets).intersection(devices).difference(failed):
+                if self.meter.sample(outlet, dt_util.utcnow()):
+                    metered.add(outlet)
+            histories = [
+                (outlet, period) for outlet, period in histories if outlet not in failed
+            ]
+            await self.client.async_update_energy(histories)
+            fetched = {
+                outlet
+                for outlet, period in histories
+                if self.energy.fetched(outlet, period, dt_util.utcnow())
+            }
+            if self._statistics is not None:
+                for outlet in fetched:
+                    if not self.energy.current(outlet, dt_util.utcnow()):
+                        continue
+                    # Like its refresh, the import of an outlet cannot fail
+                    # the refresh of the others.
+                    try:
+                        await self._statistics.async_import(outlet, dt_util.utcnow())
+                    except Exception:  # pylint: disable=broad-except
+                        _LOGGER.exception(
+                            "Error importing the energy statistics of %s",
+                            outlet.device_name,
+                        )
+            self.energy.apply(outlets)
+        except Exception as err:
+            self.update_interval = timedelta(seconds=POLL_INTERVAL_ON)
+            self._record_refreshes(devices, devices)
+            self.client.stats.record_cycle(
+                time.monotonic() - started, len(devices), success=False
+            )
+            raise UpdateFailed(f"Update failed: {err}") from err
+
+        now = time.monotonic()
+        self.client.stats.record_cycle(now - started, len(devices), success=True)
+        for device in devices:
+            self.scheduler.polled(device, now)
+        self._set_update_interval()
+
+        # Devices keep their last good data when their refresh fails, their
+        # entities are written again to flag it as stale, then unavailable.
+        changed = self._record_refreshes(devices, failed)
+        changed.update(metered)
+        changed.update(self._fingerprints_changed(self.client.devices))
+        # After a failed refresh every entity has to be written again.
+        self._changed = changed if self.last_update_success else None
+
+    def _fingerprints_changed(self, devices) -> set:
+        """Return the devices whose data changed since last time."""
+        changed = set()
+        for device in devices:
+            if self._fingerprints.get(device) != (new := fingerprint(device)):
+                self._fingerprints[device] = new
+                changed.add(device)
+        return changed
+
+    async def _async_reprobe(self, devices) -> None:
+        """Probe again the devices whose first details could not be fetched."""
+        probed, changed = self.devices.reprobe(devices)
+        if probed and self._on_devices_changed is not None:
+            # Store what they support now that it is known.
+            await self._on_devices_changed([], [])
+        if changed:
+            _LOGGER.info(
+                "Reloading to add the features found on %s",
+                ", ".join(dev.device_name for dev in changed),
+            )
+            self.hass.async_create_task(
+                self.hass.config_entries.async_reload(self.config_entry.entry_id)
+            )
+
+    async def async_restore(self, records: list[dict]) -> None:
+        """Create the devices of a stored inventory, before the first refresh."""
+        async with self._device_list_lock:
+            devices = await self.client.async_restore_devices(records)
+            self.devices.restore(devices, restore_capabilities(devices, records))
+            if devices and self._on_devices_changed is not None:
+                await self._on_devices_changed(devices, [])
+
+    async def async_refresh_device_list(self) -> None:
+        """Fetch the device list and handle the devices added or removed."""
+        async with self._device_list_lock:
+            status = {dev: _status(dev) for dev in self.client.devices}
+            if not await self.client.async_get_devices():
+                return
+            # Devices turned on or off or going offline get fresh details,
+            # the others are left to their schedule.
+            for device in self.client.devices:
+                if status.get(device, _status(device)) != _status(device):
+                    self.scheduler.status_changed(device)
+            added, removed = self.devices.update(self.client.devices)
+            if added:
+                # Capabilities are probed from the first details of a device,
+                # or again once the details of a failed device arrive.
+                failed = await self.client.async_update_devices(added)
+                self._record_refreshes(added, failed)
+                self.devices.probe_later(failed)
+                now = time.monotonic()
+                for device in added:
+                    self.scheduler.polled(device, now)
+            for device in removed:
+                self.scheduler.forget(device)
+                self.energy.forget(device)
+                self.meter.forget(device)
+                self._fingerprints.pop(device, None)
+                self._failures.pop(device, None)
+                self._commanded.discard(device)
+            if (added or removed) and self._on_devices_changed is not None:
+                await self._on_devices_changed(added, removed)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the listeners of devices whose data changed."""
+        changed, self._changed = self._changed, None
+        if changed is None or not self.last_update_success:
+            super().async_update_listeners()
+            return
+        for update_callback, context in list(self._listeners.values()):
+            if context is None or context in changed:
+                update_callback()
+
+    @callback
+    def _set_update_interval(self) -> None:
+        """Wake up when the next device or the device list is due."""
+        next_refresh = self._next_device_list
+        if (next_poll := self.scheduler.next_poll(self.client.devices)) is not None:
+            next_refresh = min(next_refresh, next_poll)
+        # Without background discovery the device list is not due anymore.
+        self.update_interval = timedelta(
+            seconds=min(
+                max(next_refresh - time.monotonic(), POLL_INTERVAL_MIN),
+                POLL_INTERVAL_OFFLINE,
+            )
+        )
+
+    @callback
+    def async_command_sent(self, device) -> None:
+        """Refresh a device shortly after a command, then poll it quickly."""
+        self.scheduler.command_sent(device, time.monotonic())
+        self._commanded.add(device)
+        if self._unsub_commanded is None:
+            self._unsub_commanded = async_call_later(
+                self.hass, COMMAND_REFRESH_DELAY, self._async_refresh_commanded
+            )
+
+    async def _async_refresh_commanded(self, _now) -> None:
+        """Refresh only the devices commanded since the last time."""
+        self._unsub_commanded = None
+        devices, self._commanded = list(self._commanded), set()
+        started = time.monotonic()
+        failed = await self.client.async_update_devices(devices)
+        now = time.monotonic()
+        self.client.stats.record_cycle(now - started, len(devices), success=True)
+        for device in devices:
+            self.scheduler.polled(device, now)
+        # Wake up for the quick polls that follow the command.
+        self._set_update_interval()
+        if self._listeners:
+            self._schedule_refresh()
+        self._record_refreshes(devices, failed)
+        self._fingerprints_changed(devices)
+        # Entities of the commanded devices are updated even when nothing
+        # changed, a number showing the value it sent waits for this refresh.
+        self._changed = set(devices)
+        self.async_update_listeners()
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop the commands and refreshes that are still waiting."""
+        self.commands.async_cancel()
+        if self._unsub_commanded is not None:
+            self._unsub_commanded()
+            self._unsub_commanded = None
+        self._commanded.clear()
@@ -7,8 +7,7 @@ from homeassistant.components.diagnostics import async_redact_data
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
-# from .common import is_humidifier
-# from .const import DOMAIN
+from .const import DOMAIN, VS_CLIENT
 
 TO_REDACT = {"cid", "uuid", "mac_id"}
 
@@ -17,14 +16,22 @@ async def async_get_config_entry_diagnostics(
     hass: HomeAssistant, entry: ConfigEntry
 ) -> dict[str, Any]:
     """Return diagnostics for a config entry."""
-    # data = hass.data[DOMAIN][entry.entry_id]
-    devices = {}
-
-    # for type in ["fans", "outlets", "switches", "bulbs"]:
-    #    for d in data["manager"]._dev_list[type]:
-    #        t = "humidifier" if is_humidifier(d.device_type) else type
-    #        devices = {
-    #            **devices,
-    #            **{t: [{k: v for k, v in d.__dict__.items() if k != "manager"}]},
-    #        }
-    return async_redact_data(devices, TO_REDACT)
+    data = hass.data[DOMAIN][entry.entry_id]
+    client = data[VS_CLIENT]
+    coordinator = data["coordinator"]
+
+    device_names = {}
+    for device in client.devices:
+        device_names[device.cid] = device.device_name
+        device_names[device.uuid] = device.device_name
+
+    return async_redact_data(
+        {
+            "coordinator": {
+                "last_update_success": coordinator.last_update_success,
+                "update_interval": str(coordinator.update_interval),
+            },
+            "api": client.stats.as_dict(device_names),
+        },
+        TO_REDACT,
+    )
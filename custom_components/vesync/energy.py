@@ -0,0 +1,295 @@
+"""Energy history of VeSync outlets."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from operator import attrgetter
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.const import ENERGY_KILO_WATT_HOUR
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from .common import device_unique_id
+from .const import DOMAIN, ENERGY_RETRY_INTERVAL
+
+# pyvesync fetches each period of an outlet's history with its own request.
+ENERGY_PERIODS = {
+    "week": "get_weekly_energy",
+    "month": "get_monthly_energy",
+    "year": "get_yearly_energy",
+}
+
+
+def _time_zone(time_zone: str):
+    """Return the time zone of an account."""
+    return dt_util.get_time_zone(time_zone) or dt_util.DEFAULT_TIME_ZONE
+
+
+class VeSyncEnergyHistory:
+    """Fetch each energy history once a day and keep its total current.
+
+    Histories are rolling windows ending today, fetched again on the first
+    refresh of every day in the account time zone as they move on by a day.
+    In between, the energy used today, reported by the outlet details, is
+    added to the fetched totals.
+    """
+
+    def __init__(
+        self,
+        time_zone: str,
+        energy_today: Callable[[object], float] = attrgetter("energy_today"),
+    ) -> None:
+        """Initialize the history of the outlets of an account."""
+        self._time_zone = _time_zone(time_zone)
+        self._energy_today = energy_today
+        # Date, history, its total and the energy used today when a period
+        # was last fetched.
+        self._fetched: dict[tuple, tuple[date, dict, float, float]] = {}
+        self._retry_at: dict[tuple, datetime] = {}
+
+    def due(self, outlets, now: datetime) -> list[tuple]:
+        """Return the ``(outlet, period)`` histories to fetch now."""
+        today = now.astimezone(self._time_zone).date()
+        return [
+            (outlet, period)
+            for outlet in outlets
+            for period in ENERGY_PERIODS
+            if self._fetched.get((outlet, period), (None,))[0] != today
+            and self._retry_at.get((outlet, period), now) <= now
+        ]
+
+    def fetched(self, outlet, period: str, now: datetime) -> bool:
+        """Record a fetched history, or retry later if the request failed."""
+        # pyvesync replaces the history when a request succeeds.
+        history = outlet.energy.get(period)
+        previous = self._fetched.get((outlet, period))
+        if history is None or (previous is not None and history is previous[1]):
+            self._retry_at[(outlet, period)] = now + timedelta(
+                seconds=ENERGY_RETRY_INTERVAL
+            )
+            return False
+        self._retry_at.pop((outlet, period), None)
+        self._fetched[(outlet, period)] = (
+            now.astimezone(self._time_zone).date(),
+            history,
+            history.get("total_energy") or 0,
+            self._energy_today(outlet),
+        )
+        return True
+
+    def current(self, outlet, now: datetime) -> bool:
+        """Return True if every period of an outlet was fetched today."""
+        today = now.astimezone(self._time_zone).date()
+        return all(
+            self._fetched.get((outlet, period), (None,))[0] == today
+            for period in ENERGY_PERIODS
+        )
+
+    def apply(self, outlets) -> None:
+        """Add the energy used since each fetch to the history totals."""
+        for outlet in outlets:
+            for period in ENERGY_PERIODS:
+                if (fetched := self._fetched.get((outlet, period))) is None:
+                    continue
+                _, history, total, today = fetched
+                history["total_energy"] = round(
+                    total + max(self._energy_today(outlet) - today, 0), 3
+                )
+
+    def forget(self, outlet) -> None:
+        """Drop the history of a removed outlet."""
+        for period in ENERGY_PERIODS:
+            self._fetched.pop((outlet, period), None)
+            self._retry_at.pop((outlet, period), None)
+
+
+@dataclass
+class _MeterReading:
+    """Energy an outlet used today, as last estimated."""
+
+    day: date
+    # Last energy_today reported by the cloud.
+    cloud: float
+    # Energy the estimate starts from and energy used since, in kWh.
+    base: float
+    since: float
+    # Highest estimate of the day, in kWh.
+    value: float
+    power: float
+    at: datetime
+    # Last energy_today reported before midnight. Until the cloud restarts
+    # from zero, its values are late updates of yesterday and are ignored.
+    yesterday: float | None = None
+
+
+class VeSyncEnergyMeter:
+    """Estimate the energy each outlet used today from its power.
+
+    The cloud only updates energy_today now and then. In between, the power
+    of the outlet is integrated over time on top of the last cloud value.
+    Estimates never decrease within a day, so the total stays increasing
+    when the cloud reports less than was estimated.
+    """
+
+    def __init__(self, time_zone: str) -> None:
+        """Initialize the meter of the outlets of an account."""
+        self._time_zone = _time_zone(time_zone)
+        self._readings: dict[object, _MeterReading] = {}
+        self._restored: dict[object, tuple[date, float]] = {}
+
+    def energy_today(self, outlet) -> float:
+        """Return the energy an outlet used today."""
+        if (reading := self._readings.get(outlet)) is None:
+            return outlet.energy_today
+        return round(reading.value, 3)
+
+    def restore(self, outlet, value: float, at: datetime) -> None:
+        """Start from a value reported before a restart, if it is from today."""
+        day = at.astimezone(self._time_zone).date()
+        if (reading := self._readings.get(outlet)) is None:
+            self._restored[outlet] = (day, value)
+        elif reading.day == day:
+            reading.value = max(reading.value, value)
+
+    def sample(self, outlet, now: datetime) -> bool:
+        """Integrate the power of a refreshed outlet, return True on change."""
+        day = now.astimezone(self._time_zone).date()
+        cloud = outlet.energy_today
+        power = outlet.power if outlet.connection_status == "online" else 0.0
+        if (reading := self._readings.get(outlet)) is None:
+            value = cloud
+            if (restored := self._restored.pop(outlet, None)) and restored[0] == day:
+                value = max(value, restored[1])
+            self._readings[outlet] = _MeterReading(
+                day, cloud, cloud, 0.0, value, power, now
+            )
+            return True
+
+        previous = round(reading.value, 3)
+        start = reading.at
+        if day != reading.day:
+            # Only what was used since midnight counts for the new day, the
+            # cloud may still report yesterday's energy for a while.
+            start = max(start, datetime.combine(day, time.min, self._time_zone))
+            reading.day = day
+            reading.yesterday = reading.cloud
+            reading.cloud = reading.base = reading.since = reading.value = 0.0
+        hours = max((now - start).total_seconds(), 0) / 3600
+        # Trapezoidal rule between the last two power readings, W to kWh.
+        reading.since += (reading.power + power) / 2 * hours / 1000
+        if reading.yesterday is not None:
+            if 0 < reading.yesterday <= cloud:
+                reading.yesterday = cloud
+                cloud = reading.cloud
+            else:
+                reading.yesterday = None
+        if cloud != reading.cloud:
+            reading.cloud = reading.base = cloud
+            reading.since = 0.0
+        reading.power = power
+        reading.at = now
+        reading.value = max(reading.value, reading.base + reading.since)
+        return round(reading.value, 3) != previous
+
+    def forget(self, outlet) -> None:
+        """Drop the readings of a removed outlet."""
+        self._readings.pop(outlet, None)
+        self._restored.pop(outlet, None)
+
+
+def _months_before(day: date, months: int) -> date:
+    """Return the first day of the month ``months`` before the one of ``day``."""
+    year, month = divmod(day.year * 12 + day.month - 1 - months, 12)
+    return date(year, month + 1, 1)
+
+
+def daily_energy(energy: dict, today: date) -> dict[date, float]:
+    """Return the energy used each past day, from the month and year histories.
+
+    Both histories list their values oldest first and end with the current
+    day and month. Past months are reported whole on their first day, minus
+    the days the month history covers.
+    """
+    used: dict[date, float] = {}
+    days = (energy.get("month") or {}).get("data") or []
+    for index, value in enumerate(days[:-1]):
+        used[today - timedelta(days=len(days) - 1 - index)] = value or 0
+    months = (energy.get("year") or {}).get("data") or []
+    for index, value in enumerate(months[:-1]):
+        start = _months_before(today, len(months) - 1 - index)
+        covered = sum(
+            v for d, v in used.items() if (d.year, d.month) == (start.year, start.month)
+        )
+        if remainder := max((value or 0) - covered, 0):
+            used[start] = used.get(start, 0) + remainder
+    return used
+
+
+class VeSyncEnergyStatistics:
+    """Import the energy history of outlets into long term statistics.
+
+    Every past day is imported once. The import of an outlet continues from
+    the last statistic the recorder holds, so a day is never counted twice,
+    even when Home Assistant stopped before the recorder committed it.
+    """
+
+    def __init__(self, hass: HomeAssistant, time_zone: str) -> None:
+        """Initialize the statistics of the outlets of an account."""
+        self.hass = hass
+        self._time_zone = _time_zone(time_zone)
+        # Start timestamp and running total of the last statistic imported.
+        self._imported: dict[str, tuple[float, float]] = {}
+
+    async def _async_last(self, statistic_id: str) -> tuple[float, float]:
+        """Return the start timestamp and sum of the last statistic recorded."""
+        if (last := self._imported.get(statistic_id)) is not None:
+            return last
+        recorded = await get_instance(self.hass).async_add_executor_job(
+            get_last_statistics, self.hass, 1, statistic_id, True, {"sum"}
+        )
+        if rows := recorded.get(statistic_id):
+            return rows[0]["start"], rows[0]["sum"] or 0.0
+        return float("-inf"), 0.0
+
+    async def async_import(self, outlet, now: datetime) -> None:
+        """Import the days of the history of an outlet not imported yet."""
+        if "recorder" not in self.hass.config.components:
+            return
+        statistic_id = f"{DOMAIN}:{slugify(device_unique_id(outlet))}_energy"
+        last, total = await self._async_last(statistic_id)
+        statistics = []
+        today = now.astimezone(self._time_zone).date()
+        for day, value in sorted(daily_energy(outlet.energy, today).items()):
+            # Statistics start on the hour in UTC, time zones may be offset
+            # by a fraction of an hour.
+            start = dt_util.as_utc(
+                datetime.combine(day, time.min, self._time_zone)
+            ).replace(minute=0, second=0, microsecond=0)
+            if start.timestamp() <= last:
+                continue
+            total = round(total + value, 3)
+            statistics.append(StatisticData(start=start, sum=total))
+            last = start.timestamp()
+        if not statistics:
+            return
+        async_add_external_statistics(
+            self.hass,
+            StatisticMetaData(
+                has_mean=False,
+                has_sum=True,
+                name=f"{outlet.device_name} energy",
+                source=DOMAIN,
+                statistic_id=statistic_id,
+                unit_of_measurement=ENERGY_KILO_WATT_HOUR,
+            ),
+            statistics,
+        )
+        self._imported[statistic_id] = (last, total)
@@ -12,17 +12,15 @@ from homeassistant.util.percentage import (
     ranged_value_to_percentage,
 )
 
-from .common import VeSyncDevice, has_feature
+from .common import VeSyncDetailedDevice
 from .const import (
     DOMAIN,
+    FAN_DETAIL_ATTRIBUTES,
     VS_DISCOVERY,
     VS_FANS,
-    VS_LEVELS,
     VS_MODE_AUTO,
     VS_MODE_MANUAL,
     VS_MODE_SLEEP,
-    VS_MODES,
-    VS_TO_HA_ATTRIBUTES,
 )
 
 
@@ -41,7 +39,9 @@ async def async_setup_entry(
         _setup_entities(devices, async_add_entities, coordinator)
 
     config_entry.async_on_unload(
-        async_dispatcher_connect(hass, VS_DISCOVERY.format(VS_FANS), discover)
+        async_dispatcher_connect(
+            hass, VS_DISCOVERY.format(config_entry.entry_id, VS_FANS), discover
+        )
     )
 
     _setup_entities(
@@ -54,29 +54,30 @@ async def async_setup_entry(
 @callback
 def _setup_entities(devices, async_add_entities, coordinator):
     """Check if device is online and add entity."""
-    async_add_entities(
-        [VeSyncFanHA(dev, coordinator) for dev in devices], update_before_add=True
-    )
+    async_add_entities([VeSyncFanHA(dev, coordinator) for dev in devices])
 
 
-class VeSyncFanHA(VeSyncDevice, FanEntity):
+class VeSyncFanHA(VeSyncDetailedDevice, FanEntity):
     """Representation of a VeSync fan."""
 
+    _detail_attributes = FAN_DETAIL_ATTRIBUTES
+
     def __init__(self, fan, coordinator) -> None:
         """Initialize the VeSync fan device."""
         super().__init__(fan, coordinator)
         self.smartfan = fan
         self._speed_range = (1, 1)
         self._attr_preset_modes = [VS_MODE_MANUAL, VS_MODE_AUTO, VS_MODE_SLEEP]
-        if has_feature(self.smartfan, "config_dict", VS_LEVELS):
-            self._speed_range = (1, max(self.smartfan.config_dict[VS_LEVELS]))
-        if has_feature(self.smartfan, "config_dict", VS_MODES):
+        capabilities = coordinator.devices.capabilities(fan)
+        if capabilities.fan_levels:
+            self._speed_range = (1, max(capabilities.fan_levels))
+        if capabilities.fan_modes:
             self._attr_preset_modes = [
                 VS_MODE_MANUAL,
                 *[
                     mode
                     for mode in [VS_MODE_AUTO, VS_MODE_SLEEP]
-                    if mode in self.smartfan.config_dict[VS_MODES]
+                    if mode in capabilities.fan_modes
                 ],
             ]
         if self.smartfan.device_type == "LV-PUR131S":
@@ -116,35 +117,23 @@ class VeSyncFanHA(VeSyncDevice, FanEntity):
         """Return the ID of this fan."""
         return self.smartfan.uuid
 
-    @property
-    def extra_state_attributes(self):
-        """Return the state attributes of the fan."""
-        attr = {}
-        for k, v in self.smartfan.details.items():
-            if k in VS_TO_HA_ATTRIBUTES:
-                attr[VS_TO_HA_ATTRIBUTES[k]] = v
-            elif k in self.state_attributes:
-                attr[f"vs_{k}"] = v
-            else:
-                attr[k] = v
-        return attr
-
-    def set_percentage(self, percentage):
+    async def async_set_percentage(self, percentage):
         """Set the speed of the device."""
         if percentage == 0:
-            self.smartfan.turn_off()
+            await self.async_send_command(self.smartfan.turn_off)
             return
 
         if not self.smartfan.is_on:
-            self.smartfan.turn_on()
+            await self.async_send_command(self.smartfan.turn_on)
 
-        self.smartfan.manual_mode()
-        self.smartfan.change_fan_speed(
-            math.ceil(percentage_to_ranged_value(self._speed_range, percentage))
+        await self.async_send_command(self.smartfan.manual_mode)
+        await self.async_send_command(
+            self.smartfan.change_fan_speed,
+            math.ceil(percentage_to_ranged_value(self._speed_range, percentage)),
         )
-        self.schedule_update_ha_state()
+        self.async_write_ha_state()
 
-    def set_preset_mode(self, preset_mode):
+    async def async_set_preset_mode(self, preset_mode):
         """Set the preset mode of device."""
         if preset_mode not in self.preset_modes:
             raise ValueError(
@@ -152,18 +141,18 @@ class VeSyncFanHA(VeSyncDevice, FanEntity):
             )
 
         if not self.smartfan.is_on:
-            self.smartfan.turn_on()
+            await self.async_send_command(self.smartfan.turn_on)
 
         if preset_mode == VS_MODE_AUTO:
-            self.smartfan.auto_mode()
+            await self.async_send_command(self.smartfan.auto_mode)
         elif preset_mode == VS_MODE_SLEEP:
-            self.smartfan.sleep_mode()
+            await self.async_send_command(self.smartfan.sleep_mode)
         elif preset_mode == VS_MODE_MANUAL:
-            self.smartfan.manual_mode()
+            await self.async_send_command(self.smartfan.manual_mode)
 
-        self.schedule_update_ha_state()
+        self.async_write_ha_state()
 
-    def turn_on(
+    async def async_turn_on(
         self,
         speed: str = None,
         percentage: int = None,
@@ -172,8 +161,8 @@ class VeSyncFanHA(VeSyncDevice, FanEntity):
     ) -> None:
         """Turn the device on."""
         if preset_mode:
-            self.set_preset_mode(preset_mode)
+            await self.async_set_preset_mode(preset_mode)
             return
         if percentage is None:
             percentage = 50
-        self.set_percentage(percentage)
+        await self.async_set_percentage(percentage)
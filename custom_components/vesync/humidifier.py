@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Mapping
+from typing import TYPE_CHECKING
 
 from homeassistant.components.humidifier import HumidifierEntity
 from homeassistant.components.humidifier.const import (
@@ -15,20 +15,22 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from pyvesync.vesyncfan import VeSyncHumid200300S
 
-from .common import VeSyncDevice
+from .common import VeSyncDetailedDevice
 from .const import (
     DOMAIN,
+    HUMIDIFIER_DETAIL_ATTRIBUTES,
     VS_DISCOVERY,
     VS_HUMIDIFIERS,
     VS_MODE_AUTO,
     VS_MODE_HUMIDITY,
     VS_MODE_MANUAL,
     VS_MODE_SLEEP,
-    VS_TO_HA_ATTRIBUTES,
 )
 
+if TYPE_CHECKING:
+    from pyvesync.vesyncfan import VeSyncHumid200300S
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -61,7 +63,9 @@ async def async_setup_entry(
         _setup_entities(devices, async_add_entities, coordinator)
 
     config_entry.async_on_unload(
-        async_dispatcher_connect(hass, VS_DISCOVERY.format(VS_HUMIDIFIERS), discover)
+        async_dispatcher_connect(
+            hass, VS_DISCOVERY.format(config_entry.entry_id, VS_HUMIDIFIERS), discover
+        )
     )
 
     _setup_entities(
@@ -74,10 +78,7 @@ async def async_setup_entry(
 @callback
 def _setup_entities(devices, async_add_entities, coordinator):
     """Check if device is online and add entity."""
-    async_add_entities(
-        [VeSyncHumidifierHA(dev, coordinator) for dev in devices],
-        update_before_add=True,
-    )
+    async_add_entities([VeSyncHumidifierHA(dev, coordinator) for dev in devices])
 
 
 def _get_ha_mode(vs_mode: str) -> str | None:
@@ -94,9 +95,10 @@ def _get_vs_mode(ha_mode: str) -> str | None:
     return vs_mode
 
 
-class VeSyncHumidifierHA(VeSyncDevice, HumidifierEntity):
+class VeSyncHumidifierHA(VeSyncDetailedDevice, HumidifierEntity):
     """Representation of a VeSync humidifier."""
 
+    _detail_attributes = HUMIDIFIER_DETAIL_ATTRIBUTES
     _attr_max_humidity = MAX_HUMIDITY
     _attr_min_humidity = MIN_HUMIDITY
 
@@ -144,53 +146,41 @@ class VeSyncHumidifierHA(VeSyncDevice, HumidifierEntity):
         """Return the ID of this humidifier."""
         return self.smarthumidifier.uuid
 
-    @property
-    def extra_state_attributes(self) -> Mapping[str, Any]:
-        """Return the state attributes of the humidifier."""
-
-        attr = {}
-        for k, v in self.smarthumidifier.details.items():
-            if k in VS_TO_HA_ATTRIBUTES:
-                attr[VS_TO_HA_ATTRIBUTES[k]] = v
-            elif k in self.state_attributes:
-                attr[f"vs_{k}"] = v
-            else:
-                attr[k] = v
-        return attr
-
-    def set_humidity(self, humidity: int) -> None:
+    async def async_set_humidity(self, humidity: int) -> None:
         """Set the target humidity of the device."""
         if humidity not in range(self.min_humidity, self.max_humidity + 1):
             raise ValueError(
                 "{humidity} is not between {self.min_humidity} and {self.max_humidity} (inclusive)"
             )
-        if self.smarthumidifier.set_humidity(humidity):
-            self.schedule_update_ha_state()
+        if await self.async_send_command(self.smarthumidifier.set_humidity, humidity):
+            self.async_write_ha_state()
         else:
             raise ValueError("An error occurred while setting humidity.")
 
-    def set_mode(self, mode: str) -> None:
+    async def async_set_mode(self, mode: str) -> None:
         """Set the mode of the device."""
         if mode not in self.available_modes:
             raise ValueError(
                 "{mode} is not one of the valid available modes: {self.available_modes}"
             )
-        if self.smarthumidifier.set_humidity_mode(_get_vs_mode(mode)):
-            self.schedule_update_ha_state()
+        if await self.async_send_command(
+            self.smarthumidifier.set_humidity_mode, _get_vs_mode(mode)
+        ):
+            self.async_write_ha_state()
         else:
             raise ValueError("An error occurred while setting mode.")
 
-    def turn_on(
+    async def async_turn_on(
         self,
         **kwargs,
     ) -> None:
         """Turn the device on."""
-        success = self.smarthumidifier.turn_on()
+        success = await self.async_send_command(self.smarthumidifier.turn_on)
         if not success:
             raise ValueError("An error occurred while turning on.")
 
-    def turn_off(self, **kwargs) -> None:
+    async def async_turn_off(self, **kwargs) -> None:
         """Turn the device off."""
-        success = self.smarthumidifier.turn_off()
+        success = await self.async_send_command(self.smarthumidifier.turn_off)
         if not success:
             raise ValueError("An error occurred while turning off.")
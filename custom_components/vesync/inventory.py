@@ -0,0 +1,81 @@
+"""Persisted inventory of the devices of a VeSync account."""
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .capabilities import KIND_AIRFRYER, VeSyncCapabilities
+from .common import VeSyncDeviceIndex, device_key, list_entry_key
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Seconds to wait before writing, devices found together are saved at once.
+SAVE_DELAY = 10
+
+
+class VeSyncInventory:
+    """Last known devices of an account, to create entities before login."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the inventory of a config entry."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.inventory"
+        )
+
+    async def async_load(self) -> list[dict[str, Any]]:
+        """Return the stored devices, if any."""
+        data = await self._store.async_load()
+        return (data or {}).get("devices", [])
+
+    @callback
+    def async_save(self, device_list: list[dict], index: VeSyncDeviceIndex) -> None:
+        """Store the devices of the device list and what they support."""
+        self._store.async_delay_save(lambda: _records(device_list, index), SAVE_DELAY)
+
+    async def async_remove(self) -> None:
+        """Delete the stored inventory."""
+        await self._store.async_remove()
+
+
+def _records(device_list: list[dict], index: VeSyncDeviceIndex) -> dict[str, Any]:
+    """Return the data to store."""
+    records = []
+    for item in device_list:
+        if (device := index.get(list_entry_key(item))) is None:
+            continue
+        capabilities = index.capabilities(device)
+        # Air fryers query the cloud when they are created. Devices probed
+        # without their details are found and probed again on next start.
+        if capabilities.kind == KIND_AIRFRYER or not index.probed(device):
+            continue
+        records.append(
+            {
+                "device": item,
+                "details": getattr(device, "details", None),
+                "config": getattr(device, "config", None),
+                "capabilities": capabilities.as_dict(),
+            }
+        )
+    return {"devices": records}
+
+
+def restore_capabilities(
+    devices: list, records: list[dict[str, Any]]
+) -> dict[tuple, VeSyncCapabilities]:
+    """Return the stored capabilities of ``devices``, keyed by device key."""
+    stored = {list_entry_key(record["device"]): record for record in records}
+    capabilities = {}
+    for device in devices:
+        key = device_key(device)
+        if (record := stored.get(key)) is None:
+            continue
+        try:
+            capabilities[key] = VeSyncCapabilities.from_dict(record["capabilities"])
+        except (KeyError, TypeError):
+            _LOGGER.debug("Probing %s again", device.device_name)
+    return capabilities
@@ -15,7 +15,7 @@ from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .common import VeSyncDevice, has_feature
-from .const import DEV_TYPE_TO_HA, DOMAIN, VS_DISCOVERY, VS_LIGHTS
+from .const import DOMAIN, VS_DISCOVERY, VS_LIGHTS
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,7 +35,9 @@ async def async_setup_entry(
         _setup_entities(devices, async_add_entities, coordinator)
 
     config_entry.async_on_unload(
-        async_dispatcher_connect(hass, VS_DISCOVERY.format(VS_LIGHTS), discover)
+        async_dispatcher_connect(
+            hass, VS_DISCOVERY.format(config_entry.entry_id, VS_LIGHTS), discover
+        )
     )
 
     _setup_entities(
@@ -50,14 +52,15 @@ def _setup_entities(devices, async_add_entities, coordinator):
     """Check if device is online and add entity."""
     entities = []
     for dev in devices:
-        if DEV_TYPE_TO_HA.get(dev.device_type) in ("walldimmer", "bulb-dimmable"):
+        capabilities = coordinator.devices.capabilities(dev)
+        if capabilities.dimmable:
             entities.append(VeSyncDimmableLightHA(dev, coordinator))
-        if DEV_TYPE_TO_HA.get(dev.device_type) in ("bulb-tunable-white",):
+        if capabilities.tunable_white:
             entities.append(VeSyncTunableWhiteLightHA(dev, coordinator))
-        if hasattr(dev, "night_light") and dev.night_light:
+        if capabilities.night_light:
             entities.append(VeSyncNightLightHA(dev, coordinator))
 
-    async_add_entities(entities, update_before_add=True)
+    async_add_entities(entities)
 
 
 def _vesync_brightness_to_ha(vesync_brightness):
@@ -98,7 +101,7 @@ class VeSyncBaseLight(VeSyncDevice, LightEntity):
         # get value from pyvesync library api,
         return _vesync_brightness_to_ha(self.device.brightness)
 
-    def turn_on(self, **kwargs):
+    async def async_turn_on(self, **kwargs):
         """Turn the device on."""
         attribute_adjustment_only = False
         # set white temperature
@@ -117,7 +120,7 @@ class VeSyncBaseLight(VeSyncDevice, LightEntity):
             # ensure value between 0-100
             color_temp = max(0, min(color_temp, 100))
             # call pyvesync library api method to set color_temp
-            self.device.set_color_temp(color_temp)
+            await self.async_send_command(self.device.set_color_temp, color_temp)
             # flag attribute_adjustment_only, so it doesn't turn_on the device redundantly
             attribute_adjustment_only = True
         # set brightness level
@@ -127,14 +130,14 @@ class VeSyncBaseLight(VeSyncDevice, LightEntity):
         ):
             # get brightness from HA data
             brightness = _ha_brightness_to_vesync(kwargs[ATTR_BRIGHTNESS])
-            self.device.set_brightness(brightness)
+            await self.async_send_command(self.device.set_brightness, brightness)
             # flag attribute_adjustment_only, so it doesn't turn_on the device redundantly
             attribute_adjustment_only = True
         # check flag if should skip sending the turn_on command
         if attribute_adjustment_only:
             return
         # send turn_on command to pyvesync api
-        self.device.turn_on()
+        await self.async_send_command(self.device.turn_on)
 
 
 class VeSyncDimmableLightHA(VeSyncBaseLight, LightEntity):
@@ -217,9 +220,9 @@ class VeSyncNightLightHA(VeSyncDimmableLightHA):
         """Initialize the VeSync device."""
         super().__init__(device, coordinator)
         self.device = device
-        self.has_brightness = has_feature(
-            self.device, "details", "night_light_brightness"
-        )
+        self.has_brightness = coordinator.devices.capabilities(
+            device
+        ).night_light_brightness
 
     @property
     def unique_id(self):
@@ -253,23 +256,24 @@ class VeSyncNightLightHA(VeSyncDimmableLightHA):
         """Return the configuration entity category."""
         return EntityCategory.CONFIG
 
-    def turn_on(self, **kwargs):
+    async def async_turn_on(self, **kwargs):
         """Turn the night light on."""
         if self.device.config_dict["module"] == "VeSyncAirBypass":
             if ATTR_BRIGHTNESS in kwargs and kwargs[ATTR_BRIGHTNESS] < 255:
-                self.device.set_night_light("dim")
+                await self.async_send_command(self.device.set_night_light, "dim")
             else:
-                self.device.set_night_light("on")
+                await self.async_send_command(self.device.set_night_light, "on")
         elif ATTR_BRIGHTNESS in kwargs:
-            self.device.set_night_light_brightness(
-                _ha_brightness_to_vesync(kwargs[ATTR_BRIGHTNESS])
+            await self.async_send_command(
+                self.device.set_night_light_brightness,
+                _ha_brightness_to_vesync(kwargs[ATTR_BRIGHTNESS]),
             )
         else:
-            self.device.set_night_light_brightness(100)
+            await self.async_send_command(self.device.set_night_light_brightness, 100)
 
-    def turn_off(self, **kwargs):
+    async def async_turn_off(self, **kwargs):
         """Turn the night light off."""
         if self.device.config_dict["module"] == "VeSyncAirBypass":
-            self.device.set_night_light("off")
+            await self.async_send_command(self.device.set_night_light, "off")
         else:
-            self.device.set_night_light_brightness(0)
+            await self.async_send_command(self.device.set_night_light_brightness, 0)
@@ -1,6 +1,12 @@
 """Support for number settings on VeSync devices."""
+from __future__ import annotations
 
-from homeassistant.components.number import NumberEntity
+from collections.abc import Callable
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Any
+
+from homeassistant.components.number import NumberEntity, NumberEntityDescription
 from homeassistant.components.sensor import SensorDeviceClass
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import PERCENTAGE
@@ -9,7 +15,8 @@ from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .common import VeSyncBaseEntity, has_feature
+from .capabilities import VeSyncCapabilities
+from .common import VeSyncDescribedEntity
 from .const import DOMAIN, VS_DISCOVERY, VS_NUMBERS
 
 MAX_HUMIDITY = 80
@@ -31,7 +38,9 @@ async def async_setup_entry(
         _setup_entities(devices, async_add_entities, coordinator)
 
     config_entry.async_on_unload(
-        async_dispatcher_connect(hass, VS_DISCOVERY.format(VS_NUMBERS), discover)
+        async_dispatcher_connect(
+            hass, VS_DISCOVERY.format(config_entry.entry_id, VS_NUMBERS), discover
+        )
     )
 
     _setup_entities(
@@ -46,178 +55,141 @@ def _setup_entities(devices, async_add_entities, coordinator):
     """Check if device is online and add entity."""
     entities = []
     for dev in devices:
-        if has_feature(dev, "details", "mist_virtual_level"):
-            entities.append(VeSyncHumidifierMistLevelHA(dev, coordinator))
-        if has_feature(dev, "config", "auto_target_humidity"):
-            entities.append(VeSyncHumidifierTargetLevelHA(dev, coordinator))
-        if has_feature(dev, "details", "warm_mist_level"):
-            entities.append(VeSyncHumidifierWarmthLevelHA(dev, coordinator))
-        if has_feature(dev, "config_dict", "levels"):
-            entities.append(VeSyncFanSpeedLevelHA(dev, coordinator))
-
-    async_add_entities(entities, update_before_add=True)
-
-
-class VeSyncNumberEntity(VeSyncBaseEntity, NumberEntity):
-    """Representation of a number for configuring a VeSync fan."""
-
-    def __init__(self, device, coordinator) -> None:
-        """Initialize the VeSync fan device."""
-        super().__init__(device, coordinator)
-
-    @property
-    def entity_category(self):
-        """Return the diagnostic entity category."""
-        return EntityCategory.CONFIG
-
-
-class VeSyncFanSpeedLevelHA(VeSyncNumberEntity):
-    """Representation of the fan speed level of a VeSync fan."""
-
-    def __init__(self, device, coordinator) -> None:
+        capabilities = coordinator.devices.capabilities(dev)
+        entities.extend(
+            VeSyncNumberEntity(dev, coordinator, description)
+            for description in NUMBERS
+            if description.exists_fn(capabilities)
+        )
+
+    async_add_entities(entities)
+
+
+@dataclass
+class VeSyncNumberEntityDescriptionMixin:
+    """Required keys of a VeSync number description."""
+
+    exists_fn: Callable[[VeSyncCapabilities], bool]
+    value_fn: Callable[[Any], float]
+    set_fn: Callable[[Any, int], bool]
+
+
+@dataclass
+class VeSyncNumberEntityDescription(
+    NumberEntityDescription, VeSyncNumberEntityDescriptionMixin
+):
+    """Describe a number of a VeSync device."""
+
+    entity_category: EntityCategory | None = EntityCategory.CONFIG
+    native_step: float | None = 1
+    # The levels supported by the model, in config_dict, give the range.
+    levels_key: str | None = None
+    levels_attribute: str | None = None
+
+
+NUMBERS: tuple[VeSyncNumberEntityDescription, ...] = (
+    VeSyncNumberEntityDescription(
+        key="mist-level",
+        name="mist level",
+        levels_key="mist_levels",
+        levels_attribute="mist levels",
+        exists_fn=attrgetter("mist_level"),
+        value_fn=lambda device: device.details["mist_virtual_level"],
+        set_fn=lambda device, value: device.set_mist_level(value),
+    ),
+    VeSyncNumberEntityDescription(
+        key="target-level",
+        name="target level",
+        native_min_value=MIN_HUMIDITY,
+        native_max_value=MAX_HUMIDITY,
+        native_unit_of_measurement=PERCENTAGE,
+        # NumberDeviceClass was introduced in 2022.12, SensorDeviceClass is
+        # the recommended fallback.
+        device_class=SensorDeviceClass.HUMIDITY,
+        exists_fn=attrgetter("target_humidity"),
+        value_fn=lambda device: device.config["auto_target_humidity"],
+        set_fn=lambda device, value: device.set_humidity(value),
+    ),
+    VeSyncNumberEntityDescription(
+        key="warm-mist",
+        name="warm mist",
+        levels_key="warm_mist_levels",
+        levels_attribute="warm mist levels",
+        exists_fn=attrgetter("warm_mist_level"),
+        value_fn=lambda device: device.details["warm_mist_level"],
+        set_fn=lambda device, value: device.set_warm_level(value),
+    ),
+    VeSyncNumberEntityDescription(
+        key="fan-speed-level",
+        name="fan speed level",
+        levels_key="levels",
+        levels_attribute="fan speed levels",
+        exists_fn=attrgetter("fan_levels"),
+        value_fn=attrgetter("speed"),
+        set_fn=lambda device, value: device.change_fan_speed(value),
+    ),
+)
+
+
+class VeSyncNumberEntity(VeSyncDescribedEntity, NumberEntity):
+    """Representation of a number for configuring a VeSync device."""
+
+    entity_description: VeSyncNumberEntityDescription
+
+    def __init__(self, device, coordinator, description) -> None:
         """Initialize the number entity."""
-        super().__init__(device, coordinator)
-        self._attr_native_min_value = device.config_dict["levels"][0]
-        self._attr_native_max_value = device.config_dict["levels"][-1]
-        self._attr_native_step = 1
-
-    @property
-    def unique_id(self):
-        """Return the ID of this device."""
-        return f"{super().unique_id}-fan-speed-level"
-
-    @property
-    def name(self):
-        """Return the name of the device."""
-        return f"{super().name} fan speed level"
-
-    @property
-    def native_value(self):
-        """Return the fan speed level."""
-        return self.device.speed
+        super().__init__(device, coordinator, description)
+        self._pending_value = None
+        self._confirming = False
+        if description.levels_key is not None:
+            levels = device.config_dict[description.levels_key]
+            self._attr_native_min_value = levels[0]
+            self._attr_native_max_value = levels[-1]
+            self._attr_extra_state_attributes = {description.levels_attribute: levels}
 
     @property
-    def extra_state_attributes(self):
-        """Return the state attributes of the humidifier."""
-        return {"fan speed levels": self.device.config_dict["levels"]}
+    def device_value(self):
+        """Return the value reported by the device."""
+        return self.entity_description.value_fn(self.device)
 
     def set_native_value(self, value):
-        """Set the fan speed level."""
-        self.device.change_fan_speed(int(value))
-
-
-class VeSyncHumidifierMistLevelHA(VeSyncNumberEntity):
-    """Representation of the mist level of a VeSync humidifier."""
-
-    def __init__(self, device, coordinator) -> None:
-        """Initialize the number entity."""
-        super().__init__(device, coordinator)
-        self._attr_native_min_value = device.config_dict["mist_levels"][0]
-        self._attr_native_max_value = device.config_dict["mist_levels"][-1]
-        self._attr_native_step = 1
-
-    @property
-    def unique_id(self):
-        """Return the ID of this device."""
-        return f"{super().unique_id}-mist-level"
-
-    @property
-    def name(self):
-        """Return the name of the device."""
-        return f"{super().name} mist level"
+        """Send the new value to the device."""
+        return self.entity_description.set_fn(self.device, int(value))
 
     @property
     def native_value(self):
-        """Return the mist level."""
-        return self.device.details["mist_virtual_level"]
-
-    @property
-    def extra_state_attributes(self):
-        """Return the state attributes of the humidifier."""
-        return {"mist levels": self.device.config_dict["mist_levels"]}
-
-    def set_native_value(self, value):
-        """Set the mist level."""
-        self.device.set_mist_level(int(value))
-
+        """Return the value being set, or the one reported by the device."""
+        if self._pending_value is not None:
+            return self._pending_value
+        return self.device_value
+
+    async def async_set_native_value(self, value):
+        """Show the new value right away and send it once the user settles."""
+        self._pending_value = value
+        self._confirming = False
+        self.async_write_ha_state()
+        self.coordinator.commands.async_queue(
+            self.device,
+            self.unique_id,
+            self.async_send_command,
+            self.set_native_value,
+            value,
+            done=self._async_command_done,
+        )
 
-class VeSyncHumidifierWarmthLevelHA(VeSyncNumberEntity):
-    """Representation of the warmth level of a VeSync humidifier."""
-
-    def __init__(self, device, coordinator) -> None:
-        """Initialize the number entity."""
-        super().__init__(device, coordinator)
-        self._attr_native_min_value = device.config_dict["warm_mist_levels"][0]
-        self._attr_native_max_value = device.config_dict["warm_mist_levels"][-1]
-        self._attr_native_step = 1
-
-    @property
-    def unique_id(self):
-        """Return the ID of this device."""
-        return f"{super().unique_id}-warm-mist"
-
-    @property
-    def name(self):
-        """Return the name of the device."""
-        return f"{super().name} warm mist"
-
-    @property
-    def native_value(self):
-        """Return the warmth level."""
-        return self.device.details["warm_mist_level"]
-
-    @property
-    def extra_state_attributes(self):
-        """Return the state attributes of the humidifier."""
-        return {"warm mist levels": self.device.config_dict["warm_mist_levels"]}
-
-    def set_native_value(self, value):
-        """Set the mist level."""
-        self.device.set_warm_level(int(value))
-
-
-class VeSyncHumidifierTargetLevelHA(VeSyncNumberEntity):
-    """Representation of the target humidity level of a VeSync humidifier."""
-
-    def __init__(self, device, coordinator) -> None:
-        """Initialize the number entity."""
-        super().__init__(device, coordinator)
-        self._attr_native_min_value = MIN_HUMIDITY
-        self._attr_native_max_value = MAX_HUMIDITY
-        self._attr_native_step = 1
-
-    @property
-    def unique_id(self):
-        """Return the ID of this device."""
-        return f"{super().unique_id}-target-level"
-
-    @property
-    def name(self):
-        """Return the name of the device."""
-        return f"{super().name} target level"
-
-    @property
-    def native_value(self):
-        """Return the current target humidity level."""
-        return self.device.config["auto_target_humidity"]
-
-    @property
-    def native_unit_of_measurement(self):
-        """Return the native unit of measurement for the target humidity level."""
-        return PERCENTAGE
-
-    @property
-    def device_class(self):
-        """
-        Return the device class of the target humidity level.
-
-        Eventually this should become NumberDeviceClass but that was introduced in 2022.12.
-        For maximum compatibility, using SensorDeviceClass as recommended by deprecation notice.
-        Or hard code this to "humidity"
-        """
-
-        return SensorDeviceClass.HUMIDITY
+    @callback
+    def _async_command_done(self, success):
+        """Keep the new value until the refresh that follows the command."""
+        if success and self.device_value != self._pending_value:
+            self._confirming = True
+            return
+        self._pending_value = None
+        self.async_write_ha_state()
 
-    def set_native_value(self, value):
-        """Set the target humidity level."""
-        self.device.set_humidity(int(value))
+    @callback
+    def _handle_coordinator_update(self):
+        """Switch back to the value reported by the device."""
+        if self._confirming:
+            self._pending_value = None
+            self._confirming = False
+        super()._handle_coordinator_update()
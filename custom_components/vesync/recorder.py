@@ -0,0 +1,32 @@
+"""Integration platform for recorder."""
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import FAN_DETAIL_ATTRIBUTES
+
+
+@callback
+def exclude_attributes(hass: HomeAssistant) -> set[str]:
+    """Exclude device details, energy totals and static levels from the database."""
+    return {
+        *FAN_DETAIL_ATTRIBUTES,
+        # Humidifier details, "humidity" and "mode" are renamed as they
+        # collide with the humidifier's own attributes.
+        "automatic_stop_reach_target",
+        "current_humidity",
+        "humidity_high",
+        "mist_level",
+        "vs_mode",
+        "warm_mist_enabled",
+        # Outlet voltage, and energy totals fetched daily and kept current
+        # with the energy used today.
+        "voltage",
+        "weekly_energy_total",
+        "monthly_energy_total",
+        "yearly_energy_total",
+        # Levels supported by number entities.
+        "mist levels",
+        "warm mist levels",
+        "fan speed levels",
+    }
@@ -1,26 +1,41 @@
 """Support for power & energy sensors for VeSync outlets."""
+from __future__ import annotations
+
 import logging
+from collections.abc import Callable
+from contextlib import suppress
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Any
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import ENERGY_KILO_WATT_HOUR, PERCENTAGE, POWER_WATT
+from homeassistant.const import (
+    ELECTRIC_POTENTIAL_VOLT,
+    ENERGY_KILO_WATT_HOUR,
+    PERCENTAGE,
+    POWER_WATT,
+    TEMP_CELSIUS,
+    TIME_MINUTES,
+    TIME_SECONDS,
+)
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.restore_state import RestoreEntity
+from homeassistant.helpers.typing import StateType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .common import VeSyncBaseEntity, has_feature
-from .const import (
-    DEV_TYPE_TO_HA,
-    DOMAIN,
-    SENSOR_TYPES_AIRFRYER,
-    VS_DISCOVERY,
-    VS_SENSORS,
-)
+from .capabilities import KIND_AIRFRYER, KIND_HUMIDIFIER, VeSyncCapabilities
+from .common import VeSyncDescribedEntity
+from .const import CONF_DIAGNOSTIC_SENSORS, DOMAIN, VS_DISCOVERY, VS_SENSORS
+from .stats import VeSyncApiStats
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -40,7 +55,9 @@ async def async_setup_entry(
         _setup_entities(devices, async_add_entities, coordinator)
 
     config_entry.async_on_unload(
-        async_dispatcher_connect(hass, VS_DISCOVERY.format(VS_SENSORS), discover)
+        async_dispatcher_connect(
+            hass, VS_DISCOVERY.format(config_entry.entry_id, VS_SENSORS), discover
+        )
     )
 
     _setup_entities(
@@ -49,363 +66,338 @@ async def async_setup_entry(
         coordinator,
     )
 
+    if config_entry.options.get(CONF_DIAGNOSTIC_SENSORS, False):
+        async_add_entities(
+            VeSyncAccountSensorEntity(coordinator, config_entry, description)
+            for description in ACCOUNT_SENSORS
+        )
+
 
 @callback
 def _setup_entities(devices, async_add_entities, coordinator):
     """Check if device is online and add entity."""
     entities = []
     for dev in devices:
-        if hasattr(dev, "fryer_status"):
-            for stype in SENSOR_TYPES_AIRFRYER.values():
-                entities.append(
-                    VeSyncairfryerSensor(
-                        dev,
-                        coordinator,
-                        stype,
-                    )
-                )
-
-        if DEV_TYPE_TO_HA.get(dev.device_type) == "outlet":
+        capabilities = coordinator.devices.capabilities(dev)
+        entities.extend(
+            (VeSyncMeteredSensorEntity if description.metered else VeSyncSensorEntity)(
+                dev, coordinator, description
+            )
+            for description in SENSORS
+            if description.exists_fn(capabilities)
+        )
+        if coordinator.detail_sensors:
             entities.extend(
-                (
-                    VeSyncPowerSensor(dev, coordinator),
-                    VeSyncEnergySensor(dev, coordinator),
-                )
+                VeSyncSensorEntity(dev, coordinator, description)
+                for description in DETAIL_SENSORS
+                if description.exists_fn(capabilities)
             )
-        if has_feature(dev, "details", "humidity"):
-            entities.append(VeSyncHumiditySensor(dev, coordinator))
-        if has_feature(dev, "details", "air_quality"):
-            entities.append(VeSyncAirQualitySensor(dev, coordinator))
-        if has_feature(dev, "details", "air_quality_value"):
-            entities.append(VeSyncAirQualityValueSensor(dev, coordinator))
-        if has_feature(dev, "details", "filter_life"):
-            entities.append(VeSyncFilterLifeSensor(dev, coordinator))
-
-    async_add_entities(entities, update_before_add=True)
-
-
-class VeSyncairfryerSensor(VeSyncBaseEntity, SensorEntity):
-    """Class representing a VeSyncairfryerSensor."""
-
-    def __init__(self, airfryer, coordinator, stype) -> None:
-        """Initialize the VeSync airfryer."""
-        super().__init__(airfryer, coordinator)
-        self.airfryer = airfryer
-        self.stype = stype
 
-    @property
-    def unique_id(self):
-        """Return unique ID for power sensor on device."""
-        return f"{super().unique_id}-" + self.stype[0]
-
-    @property
-    def name(self):
-        """Return sensor name."""
-        return self.stype[1]
-
-    @property
-    def device_class(self):
-        """Return the class."""
-        return self.stype[4]
+    async_add_entities(entities)
 
-    @property
-    def native_value(self):
-        """Return the value."""
-        value = getattr(self.airfryer, self.stype[5], None)
-        return value
 
-    @property
-    def native_unit_of_measurement(self):
-        """Return the unit of measurement."""
-        # return self.airfryer.temp_unit
-        return self.stype[2]
-
-    @property
-    def icon(self):
-        """Return the icon to use in the frontend, if any."""
-        return self.stype[3]
-
-
-class VeSyncOutletSensorEntity(VeSyncBaseEntity, SensorEntity):
-    """Representation of a sensor describing diagnostics of a VeSync outlet."""
-
-    def __init__(self, plug, coordinator) -> None:
-        """Initialize the VeSync outlet device."""
-        super().__init__(plug, coordinator)
-        self.smartplug = plug
-
-    @property
-    def entity_category(self):
-        """Return the diagnostic entity category."""
-        return EntityCategory.DIAGNOSTIC
+def _numeric_detail(key: str) -> Callable:
+    """Return an accessor of a detail that should be a number."""
 
+    def value(device):
+        quality = device.details.get(key)
+        if isinstance(quality, (int, float)):
+            return quality
+        _LOGGER.warning(
+            "Got non numeric value for AQI sensor from '%s' for %s: %s",
+            key,
+            device.device_name,
+            quality,
+        )
+        return None
 
-class VeSyncPowerSensor(VeSyncOutletSensorEntity):
-    """Representation of current power use for a VeSync outlet."""
-
-    def __init__(self, plug, coordinator) -> None:
-        """Initialize the VeSync outlet device."""
-        super().__init__(plug, coordinator)
-
-    @property
-    def unique_id(self):
-        """Return unique ID for power sensor on device."""
-        return f"{super().unique_id}-power"
-
-    @property
-    def name(self):
-        """Return sensor name."""
-        return f"{super().name} current power"
-
-    @property
-    def device_class(self):
-        """Return the power device class."""
-        return SensorDeviceClass.POWER
-
-    @property
-    def native_value(self):
-        """Return the current power usage in W."""
-        return self.smartplug.power
-
-    @property
-    def native_unit_of_measurement(self):
-        """Return the Watt unit of measurement."""
-        return POWER_WATT
-
-    @property
-    def state_class(self):
-        """Return the measurement state class."""
-        return SensorStateClass.MEASUREMENT
-
-    def update(self):
-        """Update outlet details and energy usage."""
-        self.smartplug.update()
-        self.smartplug.update_energy()
-
+    return value
+
+
+@dataclass
+class VeSyncSensorEntityDescriptionMixin:
+    """Required keys of a VeSync sensor description."""
+
+    exists_fn: Callable[[VeSyncCapabilities], bool]
+    value_fn: Callable[[Any], StateType]
+
+
+@dataclass
+class VeSyncSensorEntityDescription(
+    SensorEntityDescription, VeSyncSensorEntityDescriptionMixin
+):
+    """Describe a sensor of a VeSync device."""
+
+    # Evaluated once, on the details the device reported first.
+    device_class_fn: Callable[[Any], SensorDeviceClass | None] | None = None
+    attributes_fn: Callable[[Any], dict] | None = None
+    # Estimated by the coordinator between the updates of the cloud.
+    metered: bool = False
+
+
+def _is_airfryer(capabilities: VeSyncCapabilities) -> bool:
+    """Return True for air fryers."""
+    return capabilities.kind == KIND_AIRFRYER
+
+
+SENSORS: tuple[VeSyncSensorEntityDescription, ...] = (
+    VeSyncSensorEntityDescription(
+        key="current_temperature",
+        name="current temperature",
+        native_unit_of_measurement=TEMP_CELSIUS,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        exists_fn=_is_airfryer,
+        value_fn=attrgetter("current_temp"),
+    ),
+    VeSyncSensorEntityDescription(
+        key="set_temperature",
+        name="set temperature",
+        native_unit_of_measurement=TEMP_CELSIUS,
+        device_class=SensorDeviceClass.TEMPERATURE,
+        exists_fn=_is_airfryer,
+        value_fn=attrgetter("cook_set_temp"),
+    ),
+    VeSyncSensorEntityDescription(
+        key="cook_last_time",
+        name="cook remaining",
+        native_unit_of_measurement=TIME_MINUTES,
+        device_class=SensorDeviceClass.DURATION,
+        icon="mdi:timer",
+        exists_fn=_is_airfryer,
+        value_fn=attrgetter("cook_last_time"),
+    ),
+    VeSyncSensorEntityDescription(
+        key="preheat_last_time",
+        name="preheat remaining",
+        native_unit_of_measurement=TIME_MINUTES,
+        device_class=SensorDeviceClass.DURATION,
+        icon="mdi:timer",
+        exists_fn=_is_airfryer,
+        value_fn=attrgetter("preheat_last_time"),
+    ),
+    VeSyncSensorEntityDescription(
+        key="cook_status",
+        name="cook status",
+        icon="mdi:rotate-3d-variant",
+        exists_fn=_is_airfryer,
+        value_fn=attrgetter("cook_status"),
+    ),
+    VeSyncSensorEntityDescription(
+        key="power",
+        name="current power",
+        native_unit_of_measurement=POWER_WATT,
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        exists_fn=attrgetter("outlet"),
+        value_fn=attrgetter("power"),
+    ),
+    VeSyncSensorEntityDescription(
+        key="energy",
+        name="energy use today",
+        native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        exists_fn=attrgetter("outlet"),
+        value_fn=attrgetter("energy_today"),
+        metered=True,
+    ),
+    VeSyncSensorEntityDescription(
+        key="humidity",
+        name="current humidity",
+        native_unit_of_measurement=PERCENTAGE,
+        device_class=SensorDeviceClass.HUMIDITY,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        exists_fn=attrgetter("humidity"),
+        value_fn=lambda device: device.details["humidity"],
+    ),
+    VeSyncSensorEntityDescription(
+        key="air-quality",
+        name="air quality",
+        native_unit_of_measurement=" ",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        exists_fn=attrgetter("air_quality"),
+        value_fn=_numeric_detail("air_quality"),
+        # Some devices report a level ("good", "bad"...) instead of an index.
+        device_class_fn=lambda device: SensorDeviceClass.AQI
+        if isinstance(device.details.get("air_quality"), (int, float))
+        else None,
+    ),
+    VeSyncSensorEntityDescription(
+        key="air-quality-value",
+        name="air quality value",
+        native_unit_of_measurement=" ",
+        device_class=SensorDeviceClass.AQI,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        exists_fn=attrgetter("air_quality_value"),
+        value_fn=_numeric_detail("air_quality_value"),
+    ),
+    VeSyncSensorEntityDescription(
+        key="filter-life",
+        name="filter life",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        exists_fn=attrgetter("filter_life"),
+        value_fn=lambda device: device.filter_life
+        if hasattr(device, "filter_life")
+        else device.details["filter_life"],
+        attributes_fn=lambda device: device.details["filter_life"]
+        if isinstance(device.details["filter_life"], dict)
+        else {},
+    ),
+)
 
-class VeSyncEnergySensor(VeSyncOutletSensorEntity):
-    """Representation of current day's energy use for a VeSync outlet."""
+# Replace attributes of other entities when detail sensors are enabled.
+DETAIL_SENSORS: tuple[VeSyncSensorEntityDescription, ...] = (
+    # The histories are rolling windows which drop their oldest days, so the
+    # totals may decrease and get no state class.
+    *(
+        VeSyncSensorEntityDescription(
+            key=f"{period}-energy",
+            name=f"energy use past {name}",
+            native_unit_of_measurement=ENERGY_KILO_WATT_HOUR,
+            device_class=SensorDeviceClass.ENERGY,
+            entity_category=EntityCategory.DIAGNOSTIC,
+            exists_fn=attrgetter("outlet"),
+            value_fn=attrgetter(f"{period}_energy_total"),
+        )
+        for period, name in (
+            ("weekly", "week"),
+            ("monthly", "month"),
+            ("yearly", "year"),
+        )
+    ),
+    VeSyncSensorEntityDescription(
+        key="voltage",
+        name="voltage",
+        native_unit_of_measurement=ELECTRIC_POTENTIAL_VOLT,
+        device_class=SensorDeviceClass.VOLTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        exists_fn=attrgetter("outlet"),
+        value_fn=attrgetter("voltage"),
+    ),
+    VeSyncSensorEntityDescription(
+        key="active-time",
+        name="active time",
+        native_unit_of_measurement=TIME_MINUTES,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        # pyvesync reports the active time of outlets and the LV-PUR131S.
+        exists_fn=lambda capabilities: capabilities.outlet
+        or capabilities.module == "VeSyncAir131",
+        value_fn=lambda device: device.details["active_time"],
+    ),
+    VeSyncSensorEntityDescription(
+        key="current-mist-level",
+        name="current mist level",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        exists_fn=lambda capabilities: capabilities.kind == KIND_HUMIDIFIER,
+        value_fn=lambda device: device.details.get("mist_level"),
+    ),
+)
 
-    def __init__(self, plug, coordinator) -> None:
-        """Initialize the VeSync outlet device."""
-        super().__init__(plug, coordinator)
-        self.smartplug = plug
 
-    @property
-    def unique_id(self):
-        """Return unique ID for power sensor on device."""
-        return f"{super().unique_id}-energy"
+class VeSyncSensorEntity(VeSyncDescribedEntity, SensorEntity):
+    """Representation of a sensor of a VeSync device."""
 
-    @property
-    def name(self):
-        """Return sensor name."""
-        return f"{super().name} energy use today"
+    entity_description: VeSyncSensorEntityDescription
 
-    @property
-    def device_class(self):
-        """Return the energy device class."""
-        return SensorDeviceClass.ENERGY
+    def __init__(self, device, coordinator, description) -> None:
+        """Initialize the sensor."""
+        super().__init__(device, coordinator, description)
+        if description.device_class_fn is not None:
+            self._attr_device_class = description.device_class_fn(device)
 
     @property
     def native_value(self):
-        """Return the today total energy usage in kWh."""
-        return self.smartplug.energy_today
-
-    @property
-    def native_unit_of_measurement(self):
-        """Return the kWh unit of measurement."""
-        return ENERGY_KILO_WATT_HOUR
-
-    @property
-    def state_class(self):
-        """Return the total_increasing state class."""
-        return SensorStateClass.TOTAL_INCREASING
-
-    def update(self):
-        """Update outlet details and energy usage."""
-        self.smartplug.update()
-        self.smartplug.update_energy()
-
-
-class VeSyncHumidifierSensorEntity(VeSyncBaseEntity, SensorEntity):
-    """Representation of a sensor describing diagnostics of a VeSync humidifier."""
-
-    def __init__(self, humidifier, coordinator) -> None:
-        """Initialize the VeSync humidifier device."""
-        super().__init__(humidifier, coordinator)
-        self.smarthumidifier = humidifier
+        """Return the value reported by the device."""
+        return self.entity_description.value_fn(self.device)
 
     @property
-    def entity_category(self):
-        """Return the diagnostic entity category."""
-        return EntityCategory.DIAGNOSTIC
+    def device_attributes(self):
+        """Return the state attributes of the sensor."""
+        if self.entity_description.attributes_fn is None:
+            return None
+        return self.entity_description.attributes_fn(self.device)
 
 
-class VeSyncAirQualitySensor(VeSyncHumidifierSensorEntity):
-    """Representation of an air quality sensor."""
+class VeSyncMeteredSensorEntity(VeSyncSensorEntity, RestoreEntity):
+    """Representation of the energy an outlet used today."""
 
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_native_unit_of_measurement = " "
-
-    def __init__(self, device, coordinator) -> None:
-        """Initialize the VeSync device."""
-        super().__init__(device, coordinator)
-        self._numeric_quality = None
-        if self.native_value is not None:
-            self._numeric_quality = isinstance(self.native_value, (int, float))
-
-    @property
-    def device_class(self):
-        """Return the air quality device class."""
-        return SensorDeviceClass.AQI if self._numeric_quality else None
-
-    @property
-    def unique_id(self):
-        """Return unique ID for air quality sensor on device."""
-        return f"{super().unique_id}-air-quality"
-
-    @property
-    def name(self):
-        """Return sensor name."""
-        return f"{super().name} air quality"
+    async def async_added_to_hass(self) -> None:
+        """Keep the energy reported today before a restart from decreasing."""
+        await super().async_added_to_hass()
+        if (state := await self.async_get_last_state()) is not None:
+            with suppress(ValueError):
+                self.coordinator.meter.restore(
+                    self.device, float(state.state), state.last_updated
+                )
 
     @property
     def native_value(self):
-        """Return the air quality index."""
-        if has_feature(self.smarthumidifier, "details", "air_quality"):
-            quality = self.smarthumidifier.details["air_quality"]
-            if isinstance(quality, (int, float)):
-                return quality
-            _LOGGER.warn(
-                "Got non numeric value for AQI sensor from 'air_quality' for %s: %s",
-                self.name,
-                quality,
-            )
-        _LOGGER.warn("No air quality index found in '%s'", self.name)
-        return None
+        """Return the energy estimated from the power of the outlet."""
+        return self.coordinator.meter.energy_today(self.device)
+
+
+@dataclass
+class VeSyncAccountSensorEntityDescriptionMixin:
+    """Required keys of a VeSync account sensor description."""
+
+    value_fn: Callable[[VeSyncApiStats], StateType]
+
+
+@dataclass
+class VeSyncAccountSensorEntityDescription(
+    SensorEntityDescription, VeSyncAccountSensorEntityDescriptionMixin
+):
+    """Describe a sensor of the VeSync account itself."""
+
+
+ACCOUNT_SENSORS: tuple[VeSyncAccountSensorEntityDescription, ...] = (
+    VeSyncAccountSensorEntityDescription(
+        key="refresh-duration",
+        name="refresh duration",
+        native_unit_of_measurement=TIME_SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        value_fn=attrgetter("last_cycle_seconds"),
+    ),
+    VeSyncAccountSensorEntityDescription(
+        key="api-calls",
+        name="API calls",
+        native_unit_of_measurement="calls/min",
+        icon="mdi:api",
+        value_fn=attrgetter("calls_per_minute"),
+    ),
+)
 
 
-class VeSyncAirQualityValueSensor(VeSyncHumidifierSensorEntity):
-    """Representation of an air quality sensor."""
+class VeSyncAccountSensorEntity(CoordinatorEntity, SensorEntity):
+    """Representation of a sensor describing the VeSync account itself."""
 
+    entity_description: VeSyncAccountSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
     _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_device_class = SensorDeviceClass.AQI
-    _attr_native_unit_of_measurement = " "
-
-    def __init__(self, device, coordinator) -> None:
-        """Initialize the VeSync device."""
-        super().__init__(device, coordinator)
-
-    @property
-    def unique_id(self):
-        """Return unique ID for air quality sensor on device."""
-        return f"{super().unique_id}-air-quality-value"
 
-    @property
-    def name(self):
-        """Return sensor name."""
-        return f"{super().name} air quality value"
+    def __init__(self, coordinator, config_entry, description) -> None:
+        """Initialize the account sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self.stats = coordinator.client.stats
+        self._attr_unique_id = f"{config_entry.entry_id}-{description.key}"
+        self._attr_name = f"VeSync {config_entry.title} {description.name}"
+        self._attr_device_class = description.device_class
+        self._attr_icon = description.icon
+        self._attr_native_unit_of_measurement = description.native_unit_of_measurement
 
     @property
     def native_value(self):
-        """Return the air quality index."""
-        if has_feature(self.smarthumidifier, "details", "air_quality_value"):
-            quality_value = self.smarthumidifier.details["air_quality_value"]
-            if isinstance(quality_value, (int, float)):
-                return quality_value
-            _LOGGER.warn(
-                "Got non numeric value for AQI sensor from 'air_quality_value' for %s: %s",
-                self.name,
-                quality_value,
-            )
-        _LOGGER.warn("No air quality value found in '%s'", self.name)
-        return None
-
-
-class VeSyncFilterLifeSensor(VeSyncHumidifierSensorEntity):
-    """Representation of a filter life sensor."""
-
-    def __init__(self, plug, coordinator) -> None:
-        """Initialize the VeSync outlet device."""
-        super().__init__(plug, coordinator)
-
-    @property
-    def unique_id(self):
-        """Return unique ID for filter life sensor on device."""
-        return f"{super().unique_id}-filter-life"
-
-    @property
-    def name(self):
-        """Return sensor name."""
-        return f"{super().name} filter life"
-
-    @property
-    def device_class(self):
-        """Return the filter life device class."""
-        return None
-
-    @property
-    def native_value(self):
-        """Return the filter life index."""
-        return (
-            self.smarthumidifier.filter_life
-            if hasattr(self.smarthumidifier, "filter_life")
-            else self.smarthumidifier.details["filter_life"]
-        )
-
-    @property
-    def native_unit_of_measurement(self):
-        """Return the % unit of measurement."""
-        return PERCENTAGE
-
-    @property
-    def state_class(self):
-        """Return the measurement state class."""
-        return SensorStateClass.MEASUREMENT
-
-    @property
-    def state_attributes(self):
-        """Return the state attributes."""
-        return (
-            self.smarthumidifier.details["filter_life"]
-            if isinstance(self.smarthumidifier.details["filter_life"], dict)
-            else {}
-        )
-
-
-class VeSyncHumiditySensor(VeSyncHumidifierSensorEntity):
-    """Representation of current humidity for a VeSync humidifier."""
-
-    def __init__(self, humidity, coordinator) -> None:
-        """Initialize the VeSync outlet device."""
-        super().__init__(humidity, coordinator)
-
-    @property
-    def unique_id(self):
-        """Return unique ID for humidity sensor on device."""
-        return f"{super().unique_id}-humidity"
-
-    @property
-    def name(self):
-        """Return sensor name."""
-        return f"{super().name} current humidity"
-
-    @property
-    def device_class(self):
-        """Return the humidity device class."""
-        return SensorDeviceClass.HUMIDITY
-
-    @property
-    def native_value(self):
-        """Return the current humidity in percent."""
-        return self.smarthumidifier.details["humidity"]
-
-    @property
-    def native_unit_of_measurement(self):
-        """Return the % unit of measurement."""
-        return PERCENTAGE
-
-    @property
-    def state_class(self):
-        """Return the measurement state class."""
-        return SensorStateClass.MEASUREMENT
+        """Return the value of the statistic."""
+        return self.entity_description.value_fn(self.stats)
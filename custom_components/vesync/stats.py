@@ -0,0 +1,165 @@
+"""Accounting of the requests sent to the VeSync cloud."""
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+CYCLE_HISTORY = 20
+
+
+def endpoint_category(api: str, json_object: dict | None) -> str:
+    """Return which kind of call a request is."""
+    body = json_object or {}
+    if api == "/cloud/v1/user/login":
+        return "login"
+    if api == "/cloud/v1/deviceManaged/devices":
+        return "device_list"
+    if "energy" in api:
+        return "energy"
+    if isinstance(payload := body.get("payload"), dict):
+        method = str(payload.get("method", ""))
+        return "details" if method.startswith("get") else "command"
+    if isinstance(json_cmd := body.get("jsonCmd"), dict):
+        return "details" if "getStatus" in json_cmd else "command"
+    if api.endswith(("devicedetail", "configInfo", "configurationsV2")):
+        return "details"
+    if "getRemoteCookMode" in api:
+        return "details"
+    return "command"
+
+
+def endpoint_name(api: str, json_object: dict | None) -> str:
+    """Return the endpoint of a request, with the bypass method if any."""
+    body = json_object or {}
+    if isinstance(payload := body.get("payload"), dict):
+        return f"{api}#{payload.get('method')}"
+    if isinstance(json_cmd := body.get("jsonCmd"), dict):
+        return f"{api}#{next(iter(json_cmd), '')}"
+    return api
+
+
+class LatencyHistogram:
+    """Count request latencies per bucket."""
+
+    __slots__ = ("buckets", "count", "total")
+
+    def __init__(self) -> None:
+        """Initialize the histogram."""
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Record one latency."""
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def as_dict(self) -> dict:
+        """Return the histogram for diagnostics."""
+        labels = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [
+            f">{LATENCY_BUCKETS[-1]}s"
+        ]
+        return {
+            "count": self.count,
+            "mean_seconds": round(self.total / self.count, 3) if self.count else None,
+            "buckets": dict(zip(labels, self.buckets)),
+        }
+
+
+class VeSyncApiStats:
+    """Count requests, errors and latencies per endpoint and device."""
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.started = time.time()
+        self.calls: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+        self.retries: Counter[str] = Counter()
+        self.device_calls: Counter[str] = Counter()
+        self.latency: dict[str, LatencyHistogram] = {}
+        self.endpoint_latency: dict[str, LatencyHistogram] = {}
+        self.cycles: deque[dict] = deque(maxlen=CYCLE_HISTORY)
+        self.cycle_count = 0
+        self.cycle_failures = 0
+        self._recent: deque[float] = deque()
+
+    def record_call(
+        self,
+        api: str,
+        json_object: dict | None,
+        seconds: float,
+        error: str | None = None,
+    ) -> None:
+        """Record a request and how long it took."""
+        category = endpoint_category(api, json_object)
+        endpoint = endpoint_name(api, json_object)
+        self.calls[category] += 1
+        self.latency.setdefault(category, LatencyHistogram()).add(seconds)
+        self.endpoint_latency.setdefault(endpoint, LatencyHistogram()).add(seconds)
+        if error is not None:
+            self.errors[f"{category}: {error}"] += 1
+        body = json_object or {}
+        if device := body.get("cid") or body.get("uuid"):
+            self.device_calls[device] += 1
+        self._recent.append(time.monotonic())
+        self._trim()
+
+    def record_retry(self, reason: str) -> None:
+        """Record a request that had to be sent again."""
+        self.retries[reason] += 1
+
+    def record_cycle(self, seconds: float, polled: int, success: bool) -> None:
+        """Record a coordinator refresh."""
+        self.cycle_count += 1
+        if not success:
+            self.cycle_failures += 1
+        self.cycles.append(
+            {
+                "finished": time.time(),
+                "seconds": round(seconds, 3),
+                "devices_polled": polled,
+                "success": success,
+            }
+        )
+
+    @property
+    def last_cycle_seconds(self) -> float | None:
+        """Return how long the last refresh took."""
+        return self.cycles[-1]["seconds"] if self.cycles else None
+
+    @property
+    def calls_per_minute(self) -> int:
+        """Return the number of requests sent during the last minute."""
+        self._trim()
+        return len(self._recent)
+
+    def _trim(self) -> None:
+        """Forget the requests older than a minute."""
+        horizon = time.monotonic() - 60
+        while self._recent and self._recent[0] < horizon:
+            self._recent.popleft()
+
+    def as_dict(self, device_names: dict[str, str]) -> dict:
+        """Return the statistics for diagnostics."""
+        device_calls: Counter[str] = Counter()
+        for device, count in self.device_calls.items():
+            device_calls[device_names.get(device, "unknown")] += count
+        return {
+            "since": self.started,
+            "calls": dict(self.calls),
+            "calls_per_minute": self.calls_per_minute,
+            "errors": dict(self.errors),
+            "retries": dict(self.retries),
+            "latency": {k: v.as_dict() for k, v in self.latency.items()},
+            "endpoints": {k: v.as_dict() for k, v in self.endpoint_latency.items()},
+            "device_calls": dict(device_calls.most_common()),
+            "cycles": {
+                "count": self.cycle_count,
+                "failures": self.cycle_failures,
+                "recent": list(self.cycles),
+            },
+        }
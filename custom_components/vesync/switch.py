@@ -1,15 +1,22 @@
 """Support for VeSync switches."""
+from __future__ import annotations
+
 import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from operator import attrgetter, methodcaller
+from typing import Any
 
-from homeassistant.components.switch import SwitchEntity
+from homeassistant.components.switch import SwitchEntity, SwitchEntityDescription
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .common import VeSyncBaseEntity, VeSyncDevice
-from .const import DEV_TYPE_TO_HA, DOMAIN, VS_DISCOVERY, VS_SWITCHES
+from .capabilities import VeSyncCapabilities
+from .common import VeSyncDescribedEntity, VeSyncDevice
+from .const import DOMAIN, VS_DISCOVERY, VS_SWITCHES
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,7 +36,9 @@ async def async_setup_entry(
         _setup_entities(devices, async_add_entities, coordinator)
 
     config_entry.async_on_unload(
-        async_dispatcher_connect(hass, VS_DISCOVERY.format(VS_SWITCHES), discover)
+        async_dispatcher_connect(
+            hass, VS_DISCOVERY.format(config_entry.entry_id, VS_SWITCHES), discover
+        )
     )
 
     _setup_entities(
@@ -44,20 +53,18 @@ def _setup_entities(devices, async_add_entities, coordinator):
     """Check if device is online and add entity."""
     entities = []
     for dev in devices:
-        if DEV_TYPE_TO_HA.get(dev.device_type) == "outlet":
+        capabilities = coordinator.devices.capabilities(dev)
+        if capabilities.outlet:
             entities.append(VeSyncSwitchHA(dev, coordinator))
-        if DEV_TYPE_TO_HA.get(dev.device_type) == "switch":
+        if capabilities.light_switch:
             entities.append(VeSyncLightSwitch(dev, coordinator))
-        if getattr(dev, "set_auto_mode", None):
-            entities.append(VeSyncHumidifierAutoOnHA(dev, coordinator))
-        if getattr(dev, "automatic_stop_on", None):
-            entities.append(VeSyncHumidifierAutomaticStopHA(dev, coordinator))
-        if getattr(dev, "turn_on_display", None):
-            entities.append(VeSyncHumidifierDisplayHA(dev, coordinator))
-        if getattr(dev, "child_lock_on", None):
-            entities.append(VeSyncFanChildLockHA(dev, coordinator))
+        entities.extend(
+            VeSyncConfigSwitchEntity(dev, coordinator, description)
+            for description in CONFIG_SWITCHES
+            if description.exists_fn(capabilities)
+        )
 
-    async_add_entities(entities, update_before_add=True)
+    async_add_entities(entities)
 
 
 class VeSyncBaseSwitch(VeSyncDevice, SwitchEntity):
@@ -67,9 +74,9 @@ class VeSyncBaseSwitch(VeSyncDevice, SwitchEntity):
         """Initialize the VeSync outlet device."""
         super().__init__(plug, coordinator)
 
-    def turn_on(self, **kwargs):
+    async def async_turn_on(self, **kwargs):
         """Turn the device on."""
-        self.device.turn_on()
+        await self.async_send_command(self.device.turn_on)
 
 
 class VeSyncSwitchHA(VeSyncBaseSwitch, SwitchEntity):
@@ -81,7 +88,7 @@ class VeSyncSwitchHA(VeSyncBaseSwitch, SwitchEntity):
         self.smartplug = plug
 
     @property
-    def extra_state_attributes(self):
+    def device_attributes(self):
         """Return the state attributes of the device."""
         return (
             {
@@ -91,14 +98,10 @@ class VeSyncSwitchHA(VeSyncBaseSwitch, SwitchEntity):
                 "yearly_energy_total": self.smartplug.yearly_energy_total,
             }
             if hasattr(self.smartplug, "weekly_energy_total")
+            and not self.coordinator.detail_sensors
             else {}
         )
 
-    def update(self):
-        """Update outlet details and energy usage."""
-        self.smartplug.update()
-        self.smartplug.update_energy()
-
 
 class VeSyncLightSwitch(VeSyncBaseSwitch, SwitchEntity):
     """Handle representation of VeSync Light Switch."""
@@ -109,140 +112,81 @@ class VeSyncLightSwitch(VeSyncBaseSwitch, SwitchEntity):
         self.switch = switch
 
 
-class VeSyncSwitchEntity(VeSyncBaseEntity, SwitchEntity):
-    """Representation of a switch for configuring a VeSync humidifier."""
-
-    def __init__(self, humidifier, coordinator) -> None:
-        """Initialize the VeSync humidifier device."""
-        super().__init__(humidifier, coordinator)
-        self.smarthumidifier = humidifier
-
-    @property
-    def entity_category(self):
-        """Return the configuration entity category."""
-        return EntityCategory.CONFIG
-
-
-class VeSyncFanChildLockHA(VeSyncSwitchEntity):
-    """Representation of the child lock switch."""
-
-    def __init__(self, lock, coordinator) -> None:
-        """Initialize the VeSync outlet device."""
-        super().__init__(lock, coordinator)
-
-    @property
-    def unique_id(self):
-        """Return the ID of this display."""
-        return f"{super().unique_id}-child-lock"
-
-    @property
-    def name(self):
-        """Return the name of the entity."""
-        return f"{super().name} child lock"
-
-    @property
-    def is_on(self):
-        """Return True if it is locked."""
-        return self.device.details["child_lock"]
-
-    def turn_on(self, **kwargs):
-        """Turn the lock on."""
-        self.device.child_lock_on()
-
-    def turn_off(self, **kwargs):
-        """Turn the lock off."""
-        self.device.child_lock_off()
-
-
-class VeSyncHumidifierDisplayHA(VeSyncSwitchEntity):
-    """Representation of the child lock switch."""
-
-    def __init__(self, lock, coordinator) -> None:
-        """Initialize the VeSync outlet device."""
-        super().__init__(lock, coordinator)
-
-    @property
-    def unique_id(self):
-        """Return the ID of this display."""
-        return f"{super().unique_id}-display"
-
-    @property
-    def name(self):
-        """Return the name of the entity."""
-        return f"{super().name} display"
-
-    @property
-    def is_on(self):
-        """Return True if it is locked."""
-        return self.device.details["display"]
-
-    def turn_on(self, **kwargs):
-        """Turn the lock on."""
-        self.device.turn_on_display()
-
-    def turn_off(self, **kwargs):
-        """Turn the lock off."""
-        self.device.turn_off_display()
-
-
-class VeSyncHumidifierAutomaticStopHA(VeSyncSwitchEntity):
-    """Representation of the automatic stop toggle on a VeSync humidifier."""
-
-    def __init__(self, automatic, coordinator) -> None:
-        """Initialize the VeSync outlet device."""
-        super().__init__(automatic, coordinator)
-
-    @property
-    def unique_id(self):
-        """Return the ID of this device."""
-        return f"{super().unique_id}-automatic-stop"
-
-    @property
-    def name(self):
-        """Return the name of the device."""
-        return f"{super().name} automatic stop"
-
-    @property
-    def is_on(self):
-        """Return True if automatic stop is on."""
-        return self.device.config["automatic_stop"]
-
-    def turn_on(self, **kwargs):
-        """Turn the automatic stop on."""
-        self.device.automatic_stop_on()
-
-    def turn_off(self, **kwargs):
-        """Turn the automatic stop off."""
-        self.device.automatic_stop_off()
-
-
-class VeSyncHumidifierAutoOnHA(VeSyncSwitchEntity):
-    """Provide switch to turn off auto mode and set manual mist level 1 on a VeSync humidifier."""
-
-    def __init__(self, autooff, coordinator) -> None:
-        """Initialize the VeSync outlet device."""
-        super().__init__(autooff, coordinator)
-
-    @property
-    def unique_id(self):
-        """Return the ID of this device."""
-        return f"{super().unique_id}-auto-mode"
-
-    @property
-    def name(self):
-        """Return the name of the device."""
-        return f"{super().name} auto mode"
+def _set_manual_mode(device) -> bool:
+    """Turn auto mode off by setting manual mode and mist level 1."""
+    success = device.set_manual_mode()
+    return device.set_mist_level(1) and success
+
+
+@dataclass
+class VeSyncSwitchEntityDescriptionMixin:
+    """Required keys of a VeSync configuration switch description."""
+
+    exists_fn: Callable[[VeSyncCapabilities], bool]
+    is_on_fn: Callable[[Any], bool]
+    turn_on_fn: Callable[[Any], bool]
+    turn_off_fn: Callable[[Any], bool]
+
+
+@dataclass
+class VeSyncSwitchEntityDescription(
+    SwitchEntityDescription, VeSyncSwitchEntityDescriptionMixin
+):
+    """Describe a switch configuring a VeSync device."""
+
+    entity_category: EntityCategory | None = EntityCategory.CONFIG
+
+
+CONFIG_SWITCHES: tuple[VeSyncSwitchEntityDescription, ...] = (
+    VeSyncSwitchEntityDescription(
+        key="auto-mode",
+        name="auto mode",
+        exists_fn=attrgetter("auto_mode"),
+        is_on_fn=lambda device: device.details["mode"] == "auto",
+        turn_on_fn=methodcaller("set_auto_mode"),
+        turn_off_fn=_set_manual_mode,
+    ),
+    VeSyncSwitchEntityDescription(
+        key="automatic-stop",
+        name="automatic stop",
+        exists_fn=attrgetter("automatic_stop"),
+        is_on_fn=lambda device: device.config["automatic_stop"],
+        turn_on_fn=methodcaller("automatic_stop_on"),
+        turn_off_fn=methodcaller("automatic_stop_off"),
+    ),
+    VeSyncSwitchEntityDescription(
+        key="display",
+        name="display",
+        exists_fn=attrgetter("display"),
+        is_on_fn=lambda device: device.details["display"],
+        turn_on_fn=methodcaller("turn_on_display"),
+        turn_off_fn=methodcaller("turn_off_display"),
+    ),
+    VeSyncSwitchEntityDescription(
+        key="child-lock",
+        name="child lock",
+        exists_fn=attrgetter("child_lock"),
+        is_on_fn=lambda device: device.details["child_lock"],
+        turn_on_fn=methodcaller("child_lock_on"),
+        turn_off_fn=methodcaller("child_lock_off"),
+    ),
+)
+
+
+class VeSyncConfigSwitchEntity(VeSyncDescribedEntity, SwitchEntity):
+    """Representation of a switch for configuring a VeSync device."""
+
+    entity_description: VeSyncSwitchEntityDescription
 
     @property
     def is_on(self):
-        """Return True if in auto mode."""
-        return self.device.details["mode"] == "auto"
+        """Return True if the setting is on."""
+        return self.entity_description.is_on_fn(self.device)
 
-    def turn_on(self, **kwargs):
-        """Turn auto mode on."""
-        self.device.set_auto_mode()
+    async def async_turn_on(self, **kwargs):
+        """Turn the setting on."""
+        await self.async_send_command(self.entity_description.turn_on_fn, self.device)
 
-    def turn_off(self, **kwargs):
-        """Turn auto off by setting manual and mist level 1."""
-        self.device.set_manual_mode()
-        self.device.set_mist_level(1)
+    async def async_turn_off(self, **kwargs):
+        """Turn the setting off."""
+        await self.async_send_command(self.entity_description.turn_off_fn, self.device)
@@ -0,0 +1,46 @@
+"""Helpers for the VeSync integration tests."""
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from benchmarks.fake_vesync_cloud import FakeVeSyncCloud
+from benchmarks.run_benchmark import async_start_hass, point_at
+from custom_components.vesync.const import DOMAIN
+
+
+@asynccontextmanager
+async def async_setup_account(
+    config_dir, cloud: FakeVeSyncCloud, options: dict | None = None
+) -> AsyncIterator[tuple[HomeAssistant, ConfigEntry]]:
+    """Set up a config entry for the account served by ``cloud``."""
+    point_at(await cloud.start())
+    hass = await async_start_hass(str(config_dir))
+    entry = ConfigEntry(
+        version=1,
+        domain=DOMAIN,
+        title="test",
+        data={CONF_USERNAME: "user@example.com", CONF_PASSWORD: "secret"},
+        source="user",
+        options=options or {},
+    )
+    try:
+        await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+        yield hass, entry
+    finally:
+        await hass.async_stop()
+        await cloud.stop()
+
+
+async def async_poll_all(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Refresh every device of an entry now."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+    for device in coordinator.client.devices:
+        coordinator.scheduler.status_changed(device)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
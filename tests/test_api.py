@@ -0,0 +1,33 @@
+"""Tests for the VeSync cloud client."""
+from homeassistant.const import CONF_TOKEN
+
+from benchmarks.fake_vesync_cloud import FakeVeSyncCloud
+from custom_components.vesync.const import CONF_BACKGROUND_DISCOVERY, DOMAIN
+
+from .common import async_poll_all, async_setup_account
+
+
+async def test_expired_token_is_renewed(tmp_path):
+    """Polling and commands log in again when the token expires."""
+    cloud = FakeVeSyncCloud(outlets=2)
+    # Without background discovery the device list is not fetched again.
+    options = {CONF_BACKGROUND_DISCOVERY: False}
+    async with async_setup_account(tmp_path, cloud, options) as (hass, entry):
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        cloud.expire_token()
+        cloud.reset_counters()
+
+        await async_poll_all(hass, entry)
+
+        assert coordinator.last_update_success
+        assert not any(coordinator.is_stale(dev) for dev in coordinator.client.devices)
+        assert cloud.requests["/cloud/v1/user/login"] == 1
+        assert "/cloud/v1/deviceManaged/devices" not in cloud.requests
+        assert entry.data[CONF_TOKEN] == cloud.token
+
+        cloud.expire_token()
+        await hass.services.async_call(
+            "switch", "turn_off", {"entity_id": "switch.esw03_usa"}, blocking=True
+        )
+        assert cloud.requests["/cloud/v1/user/login"] == 2
+        assert not any(dev.state["on"] for dev in cloud.devices if dev.index == 0)
@@ -0,0 +1,44 @@
+"""Tests for the VeSync config flow."""
+from homeassistant.config_entries import SOURCE_USER
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.data_entry_flow import FlowResultType
+
+from benchmarks.fake_vesync_cloud import FakeVeSyncCloud
+from custom_components.vesync.const import DOMAIN
+
+from .common import async_setup_account
+
+
+async def test_account_is_added_once(tmp_path):
+    """An entry without unique ID gets one, the account cannot be added again."""
+    cloud = FakeVeSyncCloud(outlets=1)
+    async with async_setup_account(tmp_path, cloud) as (hass, entry):
+        assert entry.unique_id == "user@example.com-1234567"
+
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN,
+            context={"source": SOURCE_USER},
+            data={CONF_USERNAME: "user@example.com", CONF_PASSWORD: "secret"},
+        )
+
+        assert result["type"] == FlowResultType.ABORT
+        assert result["reason"] == "already_configured"
+
+
+async def test_failed_login_shows_an_error(tmp_path):
+    """A refused login shows an error instead of creating an entry."""
+    cloud = FakeVeSyncCloud(outlets=1)
+    async with async_setup_account(tmp_path, cloud) as (hass, entry):
+        cloud.login_allowed = False
+
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN,
+            context={"source": SOURCE_USER},
+            data={CONF_USERNAME: "other@example.com", CONF_PASSWORD: "wrong"},
+        )
+
+        assert result["type"] == FlowResultType.FORM
+        assert result["errors"] == {"base": "invalid_auth"}
+        (flow,) = hass.config_entries.flow.async_progress()
+        assert flow["context"].get("unique_id") is None
+        assert hass.config_entries.async_entries(DOMAIN) == [entry]
@@ -0,0 +1,156 @@
+"""Tests for the VeSync data update coordinator."""
+import asyncio
+import time
+from types import SimpleNamespace
+
+from homeassistant.const import STATE_OFF, STATE_ON, STATE_UNAVAILABLE
+
+from benchmarks.fake_vesync_cloud import FakeVeSyncCloud
+from custom_components.vesync import api
+from custom_components.vesync import coordinator as coordinator_module
+from custom_components.vesync.const import (
+    ATTR_STALE,
+    DEVICE_LIST_INTERVAL,
+    DOMAIN,
+    POLL_INTERVAL_MIN,
+    POLL_INTERVAL_OFF,
+    REFRESH_FAILURES_UNAVAILABLE,
+)
+from custom_components.vesync.energy import VeSyncEnergyStatistics
+
+from .common import async_poll_all, async_setup_account
+
+
+async def test_failing_devices_do_not_stall_the_others(tmp_path, monkeypatch):
+    """Devices that hang or raise turn stale then unavailable on their own."""
+    monkeypatch.setattr(api, "REFRESH_TIMEOUT", 0.5)
+    cloud = FakeVeSyncCloud(outlets=2, humidifiers_300s=2)
+    async with async_setup_account(tmp_path, cloud) as (hass, entry):
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        humidifiers = [
+            dev
+            for dev in coordinator.client.devices
+            if dev.device_type == "Classic300S"
+        ]
+        others = [dev for dev in coordinator.client.devices if dev not in humidifiers]
+        cloud.hanging.add(humidifiers[0].cid)
+        humidifiers[1].update = lambda: 1 / 0
+
+        for cycle in range(1, REFRESH_FAILURES_UNAVAILABLE + 1):
+            await async_poll_all(hass, entry)
+
+            assert coordinator.last_update_success
+            assert all(coordinator.is_stale(dev) for dev in humidifiers)
+            assert not any(coordinator.is_stale(dev) for dev in others)
+            assert all(coordinator.is_available(dev) for dev in others)
+            states = hass.states.async_all("humidifier")
+            if cycle < REFRESH_FAILURES_UNAVAILABLE:
+                assert all(state.attributes[ATTR_STALE] for state in states)
+            else:
+                assert all(state.state == STATE_UNAVAILABLE for state in states)
+
+        cloud.hanging.clear()
+        del humidifiers[1].update
+        await async_poll_all(hass, entry)
+
+        assert not any(coordinator.is_stale(dev) for dev in humidifiers)
+        states = hass.states.async_all("humidifier")
+        assert all(ATTR_STALE not in state.attributes for state in states)
+
+
+async def test_failed_statistics_import_is_isolated(tmp_path, monkeypatch):
+    """An outlet whose statistics import fails leaves the others imported."""
+    imported = []
+
+    async def async_import(self, outlet, now):
+        if outlet.device_name.endswith("0"):
+            raise RuntimeError("database is locked")
+        imported.append(outlet.device_name)
+
+    monkeypatch.setattr(VeSyncEnergyStatistics, "async_import", async_import)
+    cloud = FakeVeSyncCloud(outlets=2)
+    async with async_setup_account(tmp_path, cloud) as (hass, entry):
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+
+        assert coordinator.last_update_success
+        assert len(imported) == 1
+        assert not any(coordinator.is_stale(dev) for dev in coordinator.client.devices)
+
+
+async def test_command_refreshes_only_the_commanded_device(tmp_path, monkeypatch):
+    """A command is followed by a refresh of its device alone."""
+    monkeypatch.setattr(coordinator_module, "COMMAND_REFRESH_DELAY", 0)
+    cloud = FakeVeSyncCloud(outlets=3)
+    async with async_setup_account(tmp_path, cloud) as (hass, entry):
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        cycles = coordinator.client.stats.cycle_count
+        cloud.reset_counters()
+
+        await hass.services.async_call(
+            "switch", "turn_off", {"entity_id": "switch.esw03_usa"}, blocking=True
+        )
+        await asyncio.sleep(0)
+        await hass.async_block_till_done()
+
+        assert cloud.requests["/10a/v1/device/devicedetail"] == 1
+        assert coordinator.client.stats.cycle_count == cycles + 1
+        outlet = next(
+            dev for dev in coordinator.client.devices if dev.device_status == "off"
+        )
+        assert coordinator.scheduler.due([outlet], time.monotonic() + POLL_INTERVAL_MIN)
+        assert hass.states.get("switch.esw03_usa").state == "off"
+
+
+async def test_devices_turned_on_elsewhere_are_noticed(tmp_path, monkeypatch):
+    """Devices listed as on whatever their power state are polled while off."""
+    offset = [0.0]
+    monkeypatch.setattr(
+        coordinator_module,
+        "time",
+        SimpleNamespace(monotonic=lambda: time.monotonic() + offset[0]),
+    )
+    cloud = FakeVeSyncCloud(outlets=1, fans=1, humidifiers_300s=1)
+    for dev in cloud.devices:
+        dev.state["on"] = False
+    async with async_setup_account(tmp_path, cloud) as (hass, entry):
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        entity_ids = ("switch.esw03_usa", "fan.core300s", "humidifier.classic300s")
+        assert [hass.states.get(eid).state for eid in entity_ids] == [STATE_OFF] * 3
+
+        # The sweep of the device list neither polls them nor turns them on.
+        cloud.reset_counters()
+        offset[0] = DEVICE_LIST_INTERVAL
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+        assert list(cloud.requests) == ["/cloud/v1/deviceManaged/devices"]
+        assert [hass.states.get(eid).state for eid in entity_ids] == [STATE_OFF] * 3
+
+        for dev in cloud.devices:
+            dev.state["on"] = True
+        offset[0] = POLL_INTERVAL_OFF
+        await coordinator.async_refresh()
+        await hass.async_block_till_done()
+
+        assert [hass.states.get(eid).state for eid in entity_ids] == [STATE_ON] * 3
+
+
+async def test_device_probed_while_failing_is_probed_again(tmp_path, monkeypatch):
+    """Entities missed while the first details failed appear once they arrive."""
+    monkeypatch.setattr(api, "REFRESH_TIMEOUT", 0.5)
+    cloud = FakeVeSyncCloud(outlets=1, fans=1)
+    fan = next(dev for dev in cloud.devices if dev.kind == "fans")
+    cloud.hanging.add(fan.cid)
+    async with async_setup_account(tmp_path, cloud) as (hass, entry):
+        assert hass.states.get("fan.core300s") is not None
+        assert hass.states.get("sensor.core300s_air_quality_value") is None
+
+        cloud.hanging.clear()
+        await async_poll_all(hass, entry)
+        await hass.async_block_till_done()
+
+        assert hass.states.get("sensor.core300s_air_quality_value") is not None
+        # The entry was reloaded, so look the coordinator up again.
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        assert all(
+            coordinator.devices.probed(dev) for dev in coordinator.client.devices
+        )
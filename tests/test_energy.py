@@ -0,0 +1,144 @@
+"""Tests for the energy history of VeSync outlets."""
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.statistics import statistics_during_period
+from homeassistant.helpers import recorder as recorder_helper
+from homeassistant.setup import async_setup_component
+
+from benchmarks.run_benchmark import async_start_hass
+from custom_components.vesync.energy import (
+    VeSyncEnergyHistory,
+    VeSyncEnergyMeter,
+    VeSyncEnergyStatistics,
+)
+
+STATISTIC_ID = "vesync:outlet_energy"
+NOW = datetime(2026, 10, 17, 12, tzinfo=timezone.utc)
+NEXT_DAY = datetime(2026, 10, 18, 12, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+async def hass(tmp_path):
+    """Return a Home Assistant instance recording to a temporary database."""
+    hass = await async_start_hass(str(tmp_path))
+    recorder_helper.async_initialize_recorder(hass)
+    assert await async_setup_component(
+        hass, "recorder", {"recorder": {"db_url": f"sqlite:///{tmp_path}/db.sqlite"}}
+    )
+    await hass.async_block_till_done()
+    yield hass
+    await hass.async_stop()
+
+
+def _outlet(days: list[float], months: list[float]) -> SimpleNamespace:
+    """Return an outlet with the given month and year histories."""
+    return SimpleNamespace(
+        cid="outlet",
+        sub_device_no=None,
+        device_name="Outlet",
+        energy={"month": {"data": days}, "year": {"data": months}},
+    )
+
+
+class _Outlet:
+    """Outlet whose readings are set by the test."""
+
+    connection_status = "online"
+    power = 0.0
+
+    def __init__(self, energy_today: float) -> None:
+        """Initialize the outlet."""
+        self.energy_today = energy_today
+        self.energy = {}
+
+
+def test_late_update_of_yesterday_is_not_counted_today():
+    """After midnight the cloud's late total for yesterday is ignored."""
+    meter = VeSyncEnergyMeter("UTC")
+    history = VeSyncEnergyHistory("UTC", meter.energy_today)
+    outlet = _Outlet(2.0)
+    midnight = datetime(2026, 10, 18, tzinfo=timezone.utc)
+    meter.sample(outlet, midnight - timedelta(minutes=10))
+    assert meter.energy_today(outlet) == 2.0
+
+    meter.sample(outlet, midnight + timedelta(minutes=5))
+    outlet.energy["week"] = {"total_energy": 10.0}
+    assert history.fetched(outlet, "week", midnight + timedelta(minutes=5))
+    assert meter.energy_today(outlet) == 0.0
+
+    outlet.energy_today = 2.4
+    meter.sample(outlet, midnight + timedelta(minutes=10))
+    history.apply([outlet])
+    assert meter.energy_today(outlet) == 0.0
+    assert outlet.energy["week"]["total_energy"] == 10.0
+
+    outlet.energy_today = 0.1
+    meter.sample(outlet, midnight + timedelta(minutes=60))
+    history.apply([outlet])
+    assert meter.energy_today(outlet) == 0.1
+    assert outlet.energy["week"]["total_energy"] == 10.1
+
+    # From then on the cloud reports today's energy, however high.
+    outlet.energy_today = 2.5
+    meter.sample(outlet, midnight + timedelta(hours=20))
+    assert meter.energy_today(outlet) == 2.5
+
+
+async def _async_rows(hass) -> list[dict]:
+    """Return the energy statistics recorded for the outlet."""
+    await get_instance(hass).async_block_till_done()
+    rows = await get_instance(hass).async_add_executor_job(
+        statistics_during_period,
+        hass,
+        datetime(2025, 1, 1, tzinfo=timezone.utc),
+        None,
+        {STATISTIC_ID},
+        "hour",
+        None,
+        {"sum"},
+    )
+    return rows.get(STATISTIC_ID, [])
+
+
+async def test_each_day_is_imported_once(hass):
+    """Imports continue from the recorded statistics, even after a restart."""
+    outlet = _outlet([1.0] * 30, [40.0] * 12)
+    statistics = VeSyncEnergyStatistics(hass, "UTC")
+
+    await statistics.async_import(outlet, NOW)
+    rows = await _async_rows(hass)
+    await statistics.async_import(outlet, NOW)
+
+    assert await _async_rows(hass) == rows
+    assert len(rows) == 29 + 11
+    assert rows[-1]["start"] == datetime(2026, 10, 16, tzinfo=timezone.utc).timestamp()
+    total = rows[-1]["sum"]
+
+    # A new instance, as after a restart, reads where the import stopped.
+    outlet.energy["month"]["data"] = [1.0] * 28 + [3.0, 0.5]
+    await VeSyncEnergyStatistics(hass, "UTC").async_import(outlet, NEXT_DAY)
+
+    new_rows = await _async_rows(hass)
+    assert new_rows[:-1] == rows
+    assert new_rows[-1]["start"] == NOW.replace(hour=0).timestamp()
+    assert new_rows[-1]["sum"] == pytest.approx(total + 3.0)
+
+
+async def test_half_hour_time_zone_starts_on_the_hour(hass):
+    """Days of a time zone offset by half an hour get one statistic each."""
+    outlet = _outlet([1.0] * 30, [])
+    statistics = VeSyncEnergyStatistics(hass, "Asia/Kolkata")
+
+    await statistics.async_import(outlet, NOW)
+    outlet.energy["month"]["data"] = [1.0] * 30
+    await statistics.async_import(outlet, NEXT_DAY)
+
+    rows = await _async_rows(hass)
+    starts = [row["start"] for row in rows]
+    assert all(start % 3600 == 0 for start in starts)
+    assert starts == sorted(set(starts))
+    assert len(rows) == 30
+    assert rows[-1]["sum"] == pytest.approx(30.0)
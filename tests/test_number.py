@@ -0,0 +1,36 @@
+"""Tests for the VeSync number entities."""
+import asyncio
+
+from benchmarks.fake_vesync_cloud import FakeVeSyncCloud
+from custom_components.vesync import coordinator as coordinator_module
+from custom_components.vesync.const import DOMAIN
+
+from .common import async_setup_account
+
+ENTITY_ID = "number.classic300s_mist_level"
+
+
+async def test_value_not_taken_by_the_device_is_reverted(tmp_path, monkeypatch):
+    """The value sent is shown until the refresh after the command."""
+    monkeypatch.setattr(coordinator_module, "COMMAND_DEBOUNCE", 0)
+    monkeypatch.setattr(coordinator_module, "COMMAND_REFRESH_DELAY", 0)
+    cloud = FakeVeSyncCloud(humidifiers_300s=1)
+    async with async_setup_account(tmp_path, cloud) as (hass, entry):
+        coordinator = hass.data[DOMAIN][entry.entry_id]["coordinator"]
+        (humidifier,) = coordinator.client.devices
+        # The cloud accepts the command, but the device keeps its level.
+        monkeypatch.setattr(
+            type(humidifier), "set_mist_level", lambda self, level: True
+        )
+
+        await hass.services.async_call(
+            "number", "set_value", {"entity_id": ENTITY_ID, "value": 5}, blocking=True
+        )
+        assert hass.states.get(ENTITY_ID).state == "5.0"
+
+        # Wait for the command to be sent and the device refreshed.
+        for _ in range(100):
+            await asyncio.sleep(0.02)
+            if hass.states.get(ENTITY_ID).state != "5.0":
+                break
+        assert hass.states.get(ENTITY_ID).state == "1"